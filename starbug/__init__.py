@@ -1,5 +1,7 @@
 """The Starbug Application."""
 
+from pathlib import Path
+
 import typer
 from typing_extensions import Annotated
 
@@ -32,11 +34,13 @@ def generate(
     namespace: Annotated[str, typer.Option(help="Namespace to deploy to")] = "default",
 ) -> None:
     """Generate a Kubernetes Manifest for a nammed application."""
+    from collections import ChainMap
+
     import yaml
 
     from starbug.mapping import application_mapping, infrastructure_mapping, test_mapping
 
-    services = {**application_mapping, **infrastructure_mapping, **test_mapping}
+    services = ChainMap(application_mapping, infrastructure_mapping, test_mapping)
     try:
         manifests = [service.raw for service in services[name](namespace=namespace).deploy()]
         typer.echo(yaml.dump_all(manifests))
@@ -44,6 +48,22 @@ def generate(
         typer.echo(f"Service {name} not found, supported services: {', '.join(services)}")
 
 
+@app.command()
+def prepull(
+    apply: Annotated[bool, typer.Option(help="Create or update the DaemonSet instead of printing it")] = False,  # noqa: FBT002
+) -> None:
+    """Print the DaemonSet which pre-pulls the default image of every service onto spot nodes."""
+    import yaml
+
+    from starbug.prepull import build_prepull, default_images, sync_prepull
+
+    daemonset = build_prepull(default_images())
+    if apply:
+        typer.echo(f"DaemonSet/{daemonset.name} {'updated' if sync_prepull(daemonset) else 'unchanged'}")
+    else:
+        typer.echo(yaml.dump(daemonset.raw))
+
+
 @app.command()
 def crd() -> None:
     """Print the Starbug Custom Resource Definition."""
@@ -52,3 +72,42 @@ def crd() -> None:
     from starbug.kubernetes.internal.crd import starbug_crd
 
     typer.echo(yaml.dump(starbug_crd.raw))
+
+
+snapshot = typer.Typer(help="Manage Postgres snapshots.")
+app.add_typer(snapshot, name="snapshot")
+
+
+@snapshot.command("upload")
+def snapshot_upload(
+    path: Annotated[Path, typer.Argument(help="Directory containing one <database>.dump file per database")],
+) -> None:
+    """Upload a directory of Postgres dumps as the latest snapshot."""
+    from starbug.snapshot import upload_snapshot
+
+    upload_snapshot(path)
+
+
+@snapshot.command("download")
+def snapshot_download(
+    path: Annotated[Path, typer.Argument(help="Directory to download <database>.dump files into")],
+    databases: Annotated[list[str] | None, typer.Argument(help="Databases to download, defaults to all")] = None,
+) -> None:
+    """Download the latest Postgres snapshot."""
+    from starbug.snapshot import download_snapshot
+
+    download_snapshot(path, databases=databases or None)
+
+
+@snapshot.command("cronjob")
+def snapshot_cronjob(
+    namespace: Annotated[str, typer.Option(help="Namespace to deploy to")] = "starbug",
+    schedule: Annotated[str, typer.Option(help="Cron schedule to take snapshots on")] = "0 3 * * *",
+) -> None:
+    """Print the CronJob which takes Postgres snapshots."""
+    import yaml
+
+    from starbug.kubernetes.internal.snapshot import PostgresSnapshot
+
+    manifests = [component.raw for component in PostgresSnapshot(namespace=namespace, schedule=schedule).deploy()]
+    typer.echo(yaml.dump_all(manifests))
@@ -1,18 +1,83 @@
 """API Endpoints for Starbug."""
 
-from io import BytesIO
+import asyncio
+import contextlib
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from datetime import datetime
+from time import perf_counter
+from typing import Annotated
 
-import kr8s
-from azure.storage.blob import BlobServiceClient
-from fastapi import FastAPI, Response, status
-from fastapi.responses import HTMLResponse, JSONResponse
+import kr8s.asyncio
+import pendulum
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob.aio import BlobServiceClient
+from fastapi import FastAPI, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from prometheus_client import make_asgi_app
 from pydantic import BaseModel, Field
 
-from starbug.kubernetes.custom.resources import StarbugTest
+from starbug.informer import Informer, match_labels
+from starbug.kubernetes.custom.resources import AsyncStarbugTest
+from starbug.mapping import application_mapping, infrastructure_mapping, test_mapping
+from starbug.metrics import (
+    azure_request,
+    http_request_seconds,
+    kubernetes_request,
+    observe_stage,
+    results_cache_evictions,
+    results_cache_hits,
+    results_cache_misses,
+)
 from starbug.namegen import generate_name
+from starbug.results import ResultsCache
 from starbug.settings import settings
 
-api = FastAPI()
+finished_phases = ("Completed", "Failed", "Cancelled")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Create the Kubernetes and Blob Storage clients shared by every request."""
+    app.state.kube = await kr8s.asyncio.api()
+    app.state.blob = BlobServiceClient.from_connection_string(
+        settings.storage_account_dsn,
+        max_single_get_size=settings.results_chunk_size,
+        max_chunk_get_size=settings.results_chunk_size,
+    )
+    app.state.results = ResultsCache(
+        path=settings.results_cache_path,
+        max_bytes=settings.results_cache_max_bytes,
+        chunk_size=settings.results_chunk_size,
+        revalidate_in_seconds=settings.results_cache_revalidate_in_seconds,
+    )
+    results_cache_hits.set_function(lambda: app.state.results.hits)
+    results_cache_misses.set_function(lambda: app.state.results.misses)
+    results_cache_evictions.set_function(lambda: app.state.results.evictions)
+    app.state.creates = asyncio.Semaphore(settings.api_create_concurrency)
+    app.state.informer = Informer(app.state.kube)
+    informer = asyncio.create_task(app.state.informer.run())
+    async with app.state.blob:
+        yield
+    informer.cancel()
+
+
+api = FastAPI(lifespan=lifespan)
+api.mount("/metrics", make_asgi_app())
+
+
+@api.middleware("http")
+async def observe_request(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    """Record how long each request takes, labelled by its route template rather than its path."""
+    start = perf_counter()
+    response = await call_next(request)
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    http_request_seconds.labels(method=request.method, route=route, status=response.status_code).observe(
+        perf_counter() - start,
+    )
+    return response
 
 
 class Results(BaseModel):
@@ -45,11 +110,19 @@ class JobSpec(BaseModel):
     test: TestSpec
 
 
-@api.post("/test")
-def post_test(spec: JobSpec) -> JSONResponse:
-    """Create a test."""
+def spec_errors(spec: JobSpec) -> list[str]:
+    """Return a list of components in a spec which Starbug does not know how to deploy."""
+    errors = [f"Unknown infrastructure: {i.name}" for i in spec.infrastructure if i.name not in infrastructure_mapping]
+    errors += [f"Unknown application: {i.name}" for i in spec.applications if i.name not in application_mapping]
+    if spec.test.name not in test_mapping:
+        errors.append(f"Unknown test: {spec.test.name}")
+    return errors
+
+
+async def create_test(request: Request, spec: JobSpec) -> AsyncStarbugTest:
+    """Create the StarbugTest for a spec."""
     payload = spec.model_dump(exclude_none=True)
-    StarbugTest(
+    test = AsyncStarbugTest(
         {
             "apiVersion": "bink.com/v1",
             "kind": "StarbugTest",
@@ -60,59 +133,277 @@ def post_test(spec: JobSpec) -> JSONResponse:
                 "test": payload["test"],
             },
         },
-    ).create()
-    return JSONResponse(content={"name": payload["name"]}, status_code=status.HTTP_201_CREATED)
+        api=request.app.state.kube,
+    )
+    with kubernetes_request("create", "StarbugTest"):
+        await test.create()
+    request.app.state.informer.update(test)
+    return test
+
+
+@api.post("/test")
+async def post_test(request: Request, spec: JobSpec) -> JSONResponse:
+    """Create a test."""
+    await create_test(request, spec)
+    return JSONResponse(content={"name": spec.name}, status_code=status.HTTP_201_CREATED)
+
+
+@api.post("/tests:batch")
+async def post_tests(request: Request, specs: list[JobSpec]) -> JSONResponse:
+    """Create many tests at once.
+
+    Every spec is validated before anything is created, then the tests are created concurrently, at most
+    `api_create_concurrency` at a time across every batch, and a result is returned for each one in the order
+    they were submitted. Batches larger than `api_batch_max_size` are rejected outright.
+    """
+    if len(specs) > settings.api_batch_max_size:
+        return JSONResponse(
+            content={"error": f"At most {settings.api_batch_max_size} tests can be created at once"},
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+
+    async def limited_create(spec: JobSpec) -> AsyncStarbugTest:
+        async with request.app.state.creates:
+            return await create_test(request, spec)
+
+    names = [spec.name for spec in specs]
+    errors = [
+        {"name": spec.name, "errors": spec_errors(spec) + (["Duplicate name"] if names.count(spec.name) > 1 else [])}
+        for spec in specs
+    ]
+    if any(item["errors"] for item in errors):
+        return JSONResponse(content=errors, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    created = await asyncio.gather(*(limited_create(spec) for spec in specs), return_exceptions=True)
+    response = [
+        {"name": spec.name, "error": str(result)} if isinstance(result, Exception) else {"name": spec.name}
+        for spec, result in zip(specs, created, strict=True)
+    ]
+    failed = any("error" in item for item in response)
+    status_code = status.HTTP_207_MULTI_STATUS if failed else status.HTTP_201_CREATED
+    return JSONResponse(content=response, status_code=status_code)
+
+
+def test_summary(test: AsyncStarbugTest, *, results: bool = True) -> dict:
+    """Return the name and status of a test as returned by the API."""
+    summary = {"name": test.name, "status": {"phase": test.status.phase}}
+    if results:
+        summary["status"]["results"] = test.status.results
+    return summary
 
 
 @api.get("/test")
+async def get_tests(
+    request: Request,
+    limit: Annotated[int | None, Query(gt=0)] = None,
+    continue_token: Annotated[str | None, Query(alias="continue")] = None,
+    phase: str | None = None,
+    label_selector: Annotated[str | None, Query(alias="labelSelector")] = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    results: bool = True,  # noqa: FBT001, FBT002
+) -> JSONResponse:
+    """Get the status of all tests, optionally filtered and paginated.
+
+    Pages follow the Kubernetes limit/continue contract, the token for the next page is returned in the
+    X-Continue header alongside X-Remaining-Item-Count. Tests are read from the informer's mirror, the
+    X-Resource-Version header reports how fresh it is.
+    """
+    informer = request.app.state.informer
+    await informer.synced.wait()
+    created_after = created_after and pendulum.instance(created_after)
+    created_before = created_before and pendulum.instance(created_before)
+
+    def predicate(test: AsyncStarbugTest) -> bool:
+        created = pendulum.parse(test.metadata.get("creationTimestamp", "1970-01-01T00:00:00Z"))
+        return (
+            (phase is None or test.status.get("phase") == phase)
+            and (label_selector is None or match_labels(label_selector, test.metadata.get("labels", {})))
+            and (created_after is None or created >= created_after)
+            and (created_before is None or created < created_before)
+        )
+
+    headers = {"X-Resource-Version": informer.resource_version or ""}
+    try:
+        tests, next_token, remaining = informer.page(predicate, limit=limit, continue_token=continue_token)
+    except ValueError:
+        return JSONResponse(content={"error": "Invalid continue token"}, status_code=status.HTTP_400_BAD_REQUEST)
+    if next_token:
+        headers |= {"X-Continue": next_token, "X-Remaining-Item-Count": str(remaining)}
+    response = [test_summary(test, results=results) for test in tests]
+    return JSONResponse(content=response, status_code=status.HTTP_200_OK, headers=headers)
+
+
 @api.get("/test/{name}")
-def get_test(name: str | None = None) -> JSONResponse:
-    """Get the status of either a single or all tests."""
-    if name:
-        try:
-            test = StarbugTest({"metadata": {"name": name, "namespace": "starbug"}})
-            test.refresh()
-            response = {"name": test.name, "status": {"phase": test.status.phase, "results": test.status.results}}
-        except kr8s._exceptions.NotFoundError:  # noqa: SLF001
-            return JSONResponse(content={"error": "Not Found"}, status_code=status.HTTP_404_NOT_FOUND)
-    else:
-        response = [
-            {
-                "name": test.name,
-                "status": {
-                    "phase": test.status.phase,
-                    "results": test.status.results,
-                },
-            }
-            for test in kr8s.get("tests", namespace="starbug")
-        ]
-    return JSONResponse(content=response, status_code=status.HTTP_200_OK)
+async def get_test(
+    request: Request,
+    name: str,
+    wait: str | None = None,
+    timeout: Annotated[float, Query(gt=0, le=600)] = 30,
+) -> JSONResponse:
+    """Get the status of a single test.
+
+    With `wait` set to a phase, the request is held until the test reaches that phase or finishes, or until
+    `timeout` seconds pass, and the status at that point is returned. Tests are read from the informer's
+    mirror, the X-Resource-Version header reports how fresh it is.
+    """
+    informer = request.app.state.informer
+    await informer.synced.wait()
+    test = informer.tests.get(name)
+    if test is not None and wait is not None:
+        with informer.subscribe(name) as queue, contextlib.suppress(TimeoutError):
+            async with asyncio.timeout(timeout):
+                while test is not None and test.status.get("phase") not in (wait, *finished_phases):
+                    try:
+                        event, test = await asyncio.wait_for(queue.get(), timeout=settings.events_keepalive_in_seconds)
+                    except TimeoutError:
+                        test = informer.tests.get(name)
+                        continue
+                    if event == "DELETED":
+                        test = None
+        test = informer.tests.get(name)
+    headers = {"X-Resource-Version": informer.resource_version or ""}
+    if test is None:
+        return JSONResponse(content={"error": "Not Found"}, status_code=status.HTTP_404_NOT_FOUND, headers=headers)
+    return JSONResponse(content=test_summary(test), status_code=status.HTTP_200_OK, headers=headers)
+
+
+@api.get("/test/{name}/events")
+async def get_test_events(request: Request, name: str) -> Response:
+    """Stream the status of a test as Server-Sent Events, one event per change, until the test is complete."""
+    informer = request.app.state.informer
+    await informer.synced.wait()
+    if name not in informer.tests:
+        return JSONResponse(content={"error": "Not Found"}, status_code=status.HTTP_404_NOT_FOUND)
+
+    async def events() -> AsyncIterator[str]:
+        with informer.subscribe(name) as queue:
+            event, test, previous = "ADDED", informer.tests.get(name), None
+            while True:
+                if event == "DELETED" or test is None:
+                    yield "event: deleted\ndata: {}\n\n"
+                    return
+                summary = test_summary(test)
+                if summary != previous:
+                    yield f"event: status\ndata: {json.dumps(summary)}\n\n"
+                    previous = summary
+                if test.status.get("complete"):
+                    return
+                try:
+                    event, test = await asyncio.wait_for(queue.get(), timeout=settings.events_keepalive_in_seconds)
+                except TimeoutError:
+                    event, test = None, informer.tests.get(name)
+                    yield ": keepalive\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 
 @api.delete("/test/{name}")
-def delete_test(name: str) -> Response:
+async def delete_test(request: Request, name: str) -> Response:
     """Cancel a test."""
-    test = StarbugTest({"metadata": {"name": name, "namespace": "starbug"}})
-    test.patch({"status": {"phase": "Cancelled"}})
+    test = AsyncStarbugTest({"metadata": {"name": name, "namespace": "starbug"}}, api=request.app.state.kube)
+    with kubernetes_request("patch", "StarbugTest"):
+        await test.patch({"status": {"phase": "Cancelled"}})
+    request.app.state.informer.update(test)
     return Response(status_code=status.HTTP_202_ACCEPTED)
 
 
-@api.post("/results/{name}")
-def post_results(name: str, results: Results) -> Response:
-    """Update the status.results field for a test."""
+@api.post("/results/{namespace}")
+async def post_results(request: Request, namespace: str, results: Results) -> Response:
+    """Update the status.results field for the test deployed to a namespace."""
+    await request.app.state.informer.synced.wait()
+    name = request.app.state.informer.deployed_to(namespace)
     result_url = f"{settings.results_base_url}/{results.filename}"
-    test = StarbugTest({"metadata": {"name": name, "namespace": "starbug"}})
-    test.patch({"status": {"results": result_url, "phase": "Completed" if results.exit_code == 0 else "Failed"}})
+    test = AsyncStarbugTest({"metadata": {"name": name, "namespace": "starbug"}}, api=request.app.state.kube)
+    uploaded = pendulum.now("UTC")
+    with kubernetes_request("patch", "StarbugTest"):
+        await test.patch(
+            {
+                "status": {
+                    "results": result_url,
+                    "phase": "Completed" if results.exit_code == 0 else "Failed",
+                    "timings": {"resultsUploaded": uploaded.to_iso8601_string()},
+                },
+            },
+        )
+    observe_stage("resultsUploaded", created=test.metadata.creationTimestamp, when=uploaded)
+    request.app.state.informer.update(test)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
+def parse_range(header: str, size: int) -> tuple[int, int]:
+    """Parse a single HTTP byte range into an inclusive (start, end) pair.
+
+    Args:
+        header (str): The value of the Range header, such as "bytes=0-1023".
+        size (int): The size of the resource in bytes.
+
+    Raises:
+        ValueError: The range is malformed, contains multiple ranges, or cannot be satisfied.
+
+    """
+    unit, _, byte_range = header.partition("=")
+    if unit.strip() != "bytes" or "," in byte_range:
+        raise ValueError(header)
+    first, _, last = byte_range.strip().partition("-")
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
 @api.get("/results/{namespace}/{filename}")
-def get_results(namespace: str, filename: str) -> HTMLResponse:
-    """Get the results for a test."""
+async def get_results(request: Request, namespace: str, filename: str) -> Response:
+    """Stream the results for a test, supporting conditional and ranged requests.
+
+    Cached results are served, and conditional requests answered, from the local results cache without a round
+    trip to Blob Storage, the blob's ETag is only checked again once the cached copy is older than
+    `results_cache_revalidate_in_seconds`. Results which are not cached are cached as they are downloaded.
+    """
     blob_name = f"{namespace}/{filename}"
-    client = BlobServiceClient.from_connection_string(settings.storage_account_dsn)
-    blob = client.get_blob_client(container=settings.storage_account_container, blob=blob_name)
-    stream = BytesIO()
-    blob.download_blob().readinto(stream)
-    stream.seek(0)
-    return HTMLResponse(content=stream.read(), status_code=status.HTTP_200_OK)
+    results = request.app.state.results
+    blob = request.app.state.blob.get_blob_client(container=settings.storage_account_container, blob=blob_name)
+    cached = results.lookup(blob_name)
+    if cached:
+        etag, size = cached
+    else:
+        try:
+            with azure_request("blob", "get_blob_properties"):
+                properties = await blob.get_blob_properties()
+        except ResourceNotFoundError:
+            return JSONResponse(content={"error": "Not Found"}, status_code=status.HTTP_404_NOT_FOUND)
+        etag, size = properties.etag, properties.size
+        results.validate(blob_name, etag)
+    headers = {"ETag": etag, "Accept-Ranges": "bytes"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match == "*" or etag in [value.strip() for value in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    start, end, status_code = 0, size - 1, status.HTTP_200_OK
+    if "range" in request.headers:
+        try:
+            start, end = parse_range(request.headers["range"], size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+    headers["Content-Length"] = str(end - start + 1)
+    if not size:
+        return Response(status_code=status_code, headers=headers, media_type="text/html")
+    file = await results.open(blob_name, etag)
+    if file:
+        body = results.read(file, start, end)
+    else:
+        with azure_request("blob", "download_blob"):
+            downloader = await blob.download_blob(
+                offset=start,
+                length=end - start + 1,
+                etag=etag,
+                match_condition=MatchConditions.IfNotModified,
+            )
+        body = downloader.chunks()
+        if status_code == status.HTTP_200_OK and size <= results.max_bytes:
+            body = results.store(blob_name, etag, body)
+    return StreamingResponse(body, status_code=status_code, headers=headers, media_type="text/html")
@@ -1,36 +1,114 @@
 """Module providing functions for interacting with Azure."""
 
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from threading import Lock
+from time import sleep
+
+from azure.core.credentials import AccessToken
+from azure.core.exceptions import HttpResponseError
 from azure.identity import DefaultAzureCredential
 from azure.mgmt.msi import ManagedServiceIdentityClient
 from loguru import logger
 
+from starbug.metrics import azure_request
 from starbug.settings import oidc_settings
 
+throttled_status_codes = (409, 429)
+
+
+class CountingCredential:
+    """Wraps DefaultAzureCredential, counting how often a token has to be acquired.
+
+    Clients sharing this credential cache the returned token until it nears expiry, so the count is the number
+    of token refreshes made by the process.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the CountingCredential class."""
+        self.credential = DefaultAzureCredential()
+        self.lock = Lock()
+        self.token_refreshes = 0
+
+    def get_token(self, *scopes: str, **kwargs: object) -> AccessToken:
+        """Acquire a token for the requested scopes."""
+        with self.lock:
+            self.token_refreshes += 1
+        logger.info(f"Acquiring Azure token for {', '.join(scopes)}")
+        return self.credential.get_token(*scopes, **kwargs)
+
+
+@cache
+def get_credential() -> CountingCredential:
+    """Return the Azure credential shared by the whole process, created on first use."""
+    return CountingCredential()
+
+
+@cache
+def get_msi_client() -> ManagedServiceIdentityClient:
+    """Return the Managed Service Identity client shared by the whole process, created on first use."""
+    return ManagedServiceIdentityClient(get_credential(), oidc_settings.subscription_id)
+
 
 class AzureOIDC:
     """Add/Removes the requested namespace to an Azure Managed Identity object for OIDC Calls."""
 
-    def __init__(self, namespace: str | None = None) -> None:
+    def __init__(self, namespace: str | None = None, identities: list[str] | None = None) -> None:
         """Initialize the AzureOIDC class.
 
         Args:
             namespace (str | None, optional): The namespace to add to the Managed Identity. Defaults to None.
+            identities (list[str] | None, optional): The Managed Identities to manage credentials for.
+                Defaults to every identity in OIDCSettings.
 
         """
         self.namespace = namespace
         self.resource_group_name = oidc_settings.resource_group_name
         self.subscription_id = oidc_settings.subscription_id
-        self.identities = oidc_settings.identities
+        self.identities = oidc_settings.identities if identities is None else identities
         self.issuer_url = oidc_settings.issuer_url
-        self.credential = DefaultAzureCredential()
-        self.client = ManagedServiceIdentityClient(self.credential, self.subscription_id)
+        self.credential = get_credential()
+        self.client = get_msi_client()
 
-    def setup_federated_credentials(self) -> None:
-        """Create Federated Identity Credentials for all Managed Identities."""
-        if not self.namespace:
-            return
-        for identity in self.identities:
-            logger.info(f"Creating Federated Identity Credentials for {self.namespace}-{identity}")
+    def with_retries(self, identity: str, action: Callable[[str], None]) -> None:
+        """Run an action for an identity, retrying with exponential backoff while Azure is throttling requests."""
+        for attempt in range(oidc_settings.retries + 1):
+            try:
+                action(identity)
+            except HttpResponseError as error:
+                if error.status_code not in throttled_status_codes or attempt == oidc_settings.retries:
+                    raise
+                delay = oidc_settings.retry_backoff_in_seconds * 2**attempt
+                logger.info(f"Azure throttled request for {self.namespace}-{identity}, retrying in {delay}s")
+                sleep(delay)
+            else:
+                return
+
+    def for_each_identity(self, action: Callable[[str], None]) -> dict[str, Exception | None]:
+        """Run an action concurrently for every identity.
+
+        Args:
+            action (Callable[[str], None]): The action to run, called with the name of each identity.
+
+        Returns:
+            dict[str, Exception | None]: Each identity, mapped to the exception raised or None on success.
+
+        """
+        with ThreadPoolExecutor(max_workers=oidc_settings.max_workers, thread_name_prefix="oidc") as pool:
+            futures = {identity: pool.submit(self.with_retries, identity, action) for identity in self.identities}
+        results = {identity: future.exception() for identity, future in futures.items()}
+        succeeded = [identity for identity, error in results.items() if error is None]
+        failed = {identity: error for identity, error in results.items() if error is not None}
+        logger.info(f"Federated Identity Credentials for {self.namespace} succeeded for: {', '.join(succeeded)}")
+        for identity, error in failed.items():
+            logger.error(f"Federated Identity Credentials for {self.namespace}-{identity} failed: {error}")
+        return results
+
+    def create_federated_credential(self, identity: str) -> None:
+        """Create a Federated Identity Credential for a single Managed Identity."""
+        logger.info(f"Creating Federated Identity Credentials for {self.namespace}-{identity}")
+        with azure_request("arm", "create_federated_credential"):
             self.client.federated_identity_credentials.create_or_update(
                 resource_group_name=self.resource_group_name,
                 resource_name=f"{self.resource_group_name}-{identity}",
@@ -44,18 +122,28 @@ class AzureOIDC:
                 },
             )
 
-    def remove_federated_credentials(self) -> None:
-        """Remove Federated Identity Credentials for all Managed Identities."""
-        if not self.namespace:
-            return
-        for identity in self.identities:
-            logger.info(f"Removing Federated Identity Credentials for {self.namespace}-{identity}")
+    def remove_federated_credential(self, identity: str) -> None:
+        """Remove a Federated Identity Credential from a single Managed Identity."""
+        logger.info(f"Removing Federated Identity Credentials for {self.namespace}-{identity}")
+        with azure_request("arm", "delete_federated_credential"):
             self.client.federated_identity_credentials.delete(
                 resource_group_name=self.resource_group_name,
                 resource_name=f"{self.resource_group_name}-{identity}",
                 federated_identity_credential_resource_name=f"{self.namespace}-{identity}",
             )
 
+    def setup_federated_credentials(self) -> dict[str, Exception | None]:
+        """Create Federated Identity Credentials for all Managed Identities."""
+        if not self.namespace:
+            return {}
+        return self.for_each_identity(self.create_federated_credential)
+
+    def remove_federated_credentials(self) -> dict[str, Exception | None]:
+        """Remove Federated Identity Credentials for all Managed Identities."""
+        if not self.namespace:
+            return {}
+        return self.for_each_identity(self.remove_federated_credential)
+
     def cleanup_federated_credentials(self) -> None:
         """Look for and remove any Federated Identity Credentials for all Managed Identities."""
         for identity in self.identities:
@@ -0,0 +1,165 @@
+"""In-memory mirror of StarbugTest objects for serving API reads."""
+
+import asyncio
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from kr8s.asyncio import Api
+from loguru import logger
+
+from starbug.kubernetes.custom.resources import AsyncStarbugTest
+from starbug.metrics import kubernetes_request
+
+
+def match_labels(selector: str, labels: dict[str, str]) -> bool:
+    """Return whether labels satisfy an equality based label selector, such as "team=ait,tier!=nightly,owner"."""
+    for requirement in filter(None, (part.strip() for part in selector.split(","))):
+        if "!=" in requirement:
+            key, _, value = requirement.partition("!=")
+            if labels.get(key.strip()) == value.strip():
+                return False
+        elif "=" in requirement:
+            key, _, value = requirement.replace("==", "=").partition("=")
+            if labels.get(key.strip()) != value.strip():
+                return False
+        elif requirement.startswith("!"):
+            if requirement[1:].strip() in labels:
+                return False
+        elif requirement not in labels:
+            return False
+    return True
+
+
+class Informer:
+    """Keeps an in-memory mirror of every StarbugTest, fed by a list and watch."""
+
+    def __init__(self, api: Api, namespace: str = "starbug") -> None:
+        """Initialize the Informer class.
+
+        Args:
+            api (Api): The asyncio kr8s client to list and watch with.
+            namespace (str, optional): The namespace to mirror tests from. Defaults to "starbug".
+
+        """
+        self.api = api
+        self.namespace = namespace
+        self.tests: dict[str, AsyncStarbugTest] = {}
+        self.resource_version: str | None = None
+        self.synced = asyncio.Event()
+        self.subscribers: defaultdict[str, set[asyncio.Queue]] = defaultdict(set)
+
+    async def relist(self) -> None:
+        """Replace the mirror with a fresh list of every test, notifying subscribers of anything that changed.
+
+        Changes which happened while the watch was down are only seen here, so they are passed on as the
+        equivalent watch events.
+        """
+        with kubernetes_request("list", "StarbugTest"):
+            async with self.api.async_get_kind(AsyncStarbugTest, namespace=self.namespace) as (_, response):
+                resources = response.json()
+        previous = self.tests
+        self.tests = {item["metadata"]["name"]: AsyncStarbugTest(item, api=self.api) for item in resources["items"]}
+        for name, test in self.tests.items():
+            if name not in previous:
+                self.notify("ADDED", test)
+            elif previous[name].metadata.get("resourceVersion") != test.metadata.get("resourceVersion"):
+                self.notify("MODIFIED", test)
+        for name, test in previous.items():
+            if name not in self.tests:
+                self.notify("DELETED", test)
+        self.resource_version = resources["metadata"]["resourceVersion"]
+        self.synced.set()
+        logger.info(f"Informer listed {len(self.tests)} tests at resourceVersion {self.resource_version}")
+
+    def update(self, test: AsyncStarbugTest) -> None:
+        """Record a test returned by a write so it can be read back before its watch event arrives."""
+        self.tests[test.name] = test
+        self.notify("MODIFIED", test)
+
+    def notify(self, event: str, test: AsyncStarbugTest) -> None:
+        """Pass a change to a test on to everything subscribed to it."""
+        for queue in self.subscribers.get(test.name, ()):
+            queue.put_nowait((event, test))
+
+    def deployed_to(self, namespace: str) -> str:
+        """Return the name of the test deployed to a namespace, which differs from it for pooled namespaces."""
+        for name, test in self.tests.items():
+            if test.status.get("namespace") == namespace:
+                return name
+        return namespace
+
+    @contextmanager
+    def subscribe(self, name: str) -> Iterator[asyncio.Queue]:
+        """Yield a queue receiving an (event, test) pair for every change to the named test."""
+        queue = asyncio.Queue()
+        self.subscribers[name].add(queue)
+        try:
+            yield queue
+        finally:
+            self.subscribers[name].discard(queue)
+            if not self.subscribers[name]:
+                del self.subscribers[name]
+
+    def page(
+        self,
+        predicate: Callable[[AsyncStarbugTest], bool],
+        limit: int | None = None,
+        continue_token: str | None = None,
+    ) -> tuple[list[AsyncStarbugTest], str | None, int]:
+        """Return one page of matching tests ordered by name, following the Kubernetes limit/continue contract.
+
+        Args:
+            predicate (Callable[[AsyncStarbugTest], bool]): Filter deciding which tests are included.
+            limit (int | None, optional): Maximum number of tests to return. Defaults to no limit.
+            continue_token (str | None, optional): Token returned by the previous page. Defaults to None.
+
+        Raises:
+            ValueError: The continue token is malformed.
+
+        Returns:
+            tuple[list[AsyncStarbugTest], str | None, int]: The page of tests, the token for the next page if
+                there is one, and the number of matching tests remaining after this page.
+
+        """
+        start = ""
+        if continue_token:
+            try:
+                start = json.loads(urlsafe_b64decode(continue_token))["start"]
+            except (binascii.Error, ValueError, KeyError, TypeError) as error:
+                raise ValueError(continue_token) from error
+        names = sorted(name for name, test in self.tests.items() if name > start and predicate(test))
+        selected = names[:limit] if limit else names
+        remaining = len(names) - len(selected)
+        next_token = urlsafe_b64encode(json.dumps({"start": selected[-1]}).encode()).decode() if remaining else None
+        return [self.tests[name] for name in selected], next_token, remaining
+
+    async def run(self) -> None:
+        """List and then watch tests forever, relisting whenever the watch cannot be resumed."""
+        while True:
+            try:
+                if self.resource_version is None:
+                    await self.relist()
+                async for event, test in self.api.watch(
+                    AsyncStarbugTest,
+                    namespace=self.namespace,
+                    since=self.resource_version,
+                ):
+                    if event == "ERROR":
+                        self.resource_version = None
+                        break
+                    self.resource_version = test.metadata.resourceVersion
+                    if event == "DELETED":
+                        self.tests.pop(test.name, None)
+                    elif event in ("ADDED", "MODIFIED"):
+                        self.tests[test.name] = test
+                    self.notify(event, test)
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa: BLE001
+                logger.exception("Informer watch on Starbug Tests failed, relisting.")
+                self.resource_version = None
+                await asyncio.sleep(5)
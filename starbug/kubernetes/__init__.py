@@ -1,31 +1,83 @@
 """Kubernetes Models."""
 
 from base64 import b64decode
+from threading import Lock
+from time import monotonic, sleep
 
+import kr8s
 from kr8s.objects import Secret
+from loguru import logger
+
+from starbug.metrics import kubernetes_request
+
+starbug_image = "binkcore.azurecr.io/starbug:latest"
+wait_for_image = "ghcr.io/groundnuty/k8s-wait-for:v2.0"
+pushgateway_image = "prom/pushgateway:v1.6.2"
 
 
 def wait_for_migration(name: str) -> dict:
     """Return a wait-for init container."""
     return {
         "name": "wait-for-migration",
-        "image": "ghcr.io/groundnuty/k8s-wait-for:v2.0",
-        "imagePullPolicy": "Always",
+        "image": wait_for_image,
         "args": ["job-wr", f"{name}-migrator"],
     }
 
 
-def wait_for_pod(name: str) -> dict:
-    """Return a wait-for init container."""
-    return {
-        "name": f"wait-for-{name}",
-        "image": "ghcr.io/groundnuty/k8s-wait-for:v2.0",
-        "imagePullPolicy": "Always",
-        "args": ["pod", f"-lapp={name}"],
-    }
+class SecretCache:
+    """A process-wide, TTL-bound cache of Kubernetes Secret values keyed by (namespace, name)."""
+
+    def __init__(self, ttl: float = 300) -> None:
+        """Initialize the SecretCache class.
+
+        Args:
+            ttl (float, optional): Seconds a Secret is cached for before being fetched again. Defaults to 300.
+
+        """
+        self.ttl = ttl
+        self.lock = Lock()
+        self.secrets: dict[tuple[str, str], tuple[float, dict[str, str]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, key: str, namespace: str = "default") -> str:
+        """Get the decoded value of a key in a Secret, fetching the Secret if it is not cached or has expired."""
+        with self.lock:
+            expires, values = self.secrets.get((namespace, name), (0, {}))
+            if expires > monotonic():
+                self.hits += 1
+            else:
+                self.misses += 1
+                values = {}
+        if not values:
+            with kubernetes_request("get", "Secret"):
+                secret = Secret.get(name=name, namespace=namespace)
+            values = {k: b64decode(v).decode("utf-8") for k, v in secret.raw.get("data", {}).items()}
+            with self.lock:
+                self.secrets[(namespace, name)] = (monotonic() + self.ttl, values)
+        return values[key]
+
+    def invalidate(self, name: str, namespace: str = "default") -> None:
+        """Remove a Secret from the cache."""
+        with self.lock:
+            self.secrets.pop((namespace, name), None)
+
+    def watch(self, namespace: str = "default") -> None:
+        """Invalidate cached Secrets in a namespace as they are modified or deleted, runs forever."""
+        while True:
+            try:
+                for event, secret in kr8s.watch("secrets", namespace=namespace):
+                    if event in ("MODIFIED", "DELETED"):
+                        logger.info(f"Secret {namespace}/{secret.name} changed, invalidating cache.")
+                        self.invalidate(secret.name, namespace=namespace)
+            except Exception:  # noqa: BLE001
+                logger.exception("Watch on Secrets failed, retrying.")
+                sleep(5)
+
+
+secret_cache = SecretCache()
 
 
 def get_secret_value(name: str, key: str, namespace: str = "default") -> str:
     """Get the Value of a Secret."""
-    secret = Secret.get(name=name, namespace=namespace)
-    return b64decode(secret.raw["data"][key]).decode("utf-8")
+    return secret_cache.get(name=name, key=key, namespace=namespace)
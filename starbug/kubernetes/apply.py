@@ -0,0 +1,173 @@
+"""Apply Kubernetes objects in dependency-ordered waves."""
+
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+from kr8s._exceptions import ServerError
+from kr8s.objects import APIObject
+from loguru import logger
+
+from starbug.metrics import kubernetes_request
+
+already_exists = 409
+rbac_kinds = ("ServiceAccount", "Role", "RoleBinding")
+ready_conditions = {"Deployment": ["condition=Available"], "Job": ["condition=Complete", "condition=Failed"]}
+
+
+def create(component: APIObject) -> None:
+    """Create a single Kubernetes object, leaving it as it is if it already exists."""
+    logger.info(f"Deploying {component.kind}/{component.name}")
+    try:
+        with kubernetes_request("create", component.kind):
+            component.create()
+    except ServerError as error:
+        if error.response is None or error.response.status_code != already_exists:
+            raise
+        logger.info(f"{component.kind}/{component.name} already exists")
+
+
+def apply(components: Iterable[APIObject], max_workers: int) -> list[tuple[APIObject, Exception]]:
+    """Create Kubernetes objects concurrently.
+
+    Args:
+        components (Iterable[APIObject]): The objects to create.
+        max_workers (int): The maximum number of objects to create at once.
+
+    Returns:
+        list[tuple[APIObject, Exception]]: Every object which failed to create, alongside the exception raised.
+
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="apply") as pool:
+        futures = [(component, pool.submit(create, component)) for component in components]
+    return [(component, future.exception()) for component, future in futures if future.exception()]
+
+
+def has_condition(component: APIObject, condition: str) -> bool:
+    """Return whether a condition in an object's status is True."""
+    return any(
+        item.get("type") == condition and item.get("status") == "True"
+        for item in component.raw.get("status", {}).get("conditions", [])
+    )
+
+
+def wait_ready(component: APIObject, timeout: int | None = None) -> None:
+    """Wait for a Deployment to become Available or a Job to finish, other kinds are ready once created.
+
+    Args:
+        component (APIObject): The object to wait for.
+        timeout (int | None, optional): Seconds to wait for. Defaults to waiting forever.
+
+    Raises:
+        RuntimeError: If a Job finishes Failed.
+
+    """
+    if component.kind not in ready_conditions:
+        return
+    logger.info(f"Waiting for {component.kind}/{component.name} to become ready")
+    with kubernetes_request("wait", component.kind):
+        component.wait(ready_conditions[component.kind], timeout=timeout)
+    if has_condition(component, "Failed"):
+        msg = f"{component.kind}/{component.name} failed"
+        raise RuntimeError(msg)
+
+
+def is_ready(component: APIObject) -> bool:
+    """Return whether a Deployment is Available or a Job has Completed, without waiting.
+
+    Other kinds are ready once created.
+
+    Args:
+        component (APIObject): The object to check, refreshed from the cluster.
+
+    Raises:
+        RuntimeError: If a Job has Failed.
+
+    """
+    if component.kind not in ready_conditions:
+        return True
+    with kubernetes_request("get", component.kind):
+        component.refresh()
+    if has_condition(component, "Failed"):
+        msg = f"{component.kind}/{component.name} failed"
+        raise RuntimeError(msg)
+    return any(has_condition(component, condition.partition("=")[2]) for condition in ready_conditions[component.kind])
+
+
+def wait_all_ready(
+    components: Iterable[APIObject],
+    max_workers: int,
+    timeout: int | None = None,
+) -> list[tuple[APIObject, Exception]]:
+    """Wait for Kubernetes objects to become ready concurrently.
+
+    Args:
+        components (Iterable[APIObject]): The objects to wait for.
+        max_workers (int): The maximum number of objects to wait for at once.
+        timeout (int | None, optional): Seconds to wait for each object. Defaults to waiting forever.
+
+    Returns:
+        list[tuple[APIObject, Exception]]: Every object which did not become ready, alongside the exception raised.
+
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ready") as pool:
+        futures = [(component, pool.submit(wait_ready, component, timeout)) for component in components]
+    return [(component, future.exception()) for component, future in futures if future.exception()]
+
+
+def dependency_tiers(dependencies: dict[str, list[str]]) -> list[list[str]]:
+    """Group components into tiers, each tier only depending on components in earlier tiers.
+
+    Dependencies on components which are not being deployed are ignored.
+
+    Args:
+        dependencies (dict[str, list[str]]): The names of the components each component depends on.
+
+    Returns:
+        list[list[str]]: The component names in each tier, in deployment order.
+
+    Raises:
+        ValueError: If the dependencies contain a cycle.
+
+    """
+    remaining = {
+        name: {dependency for dependency in depends_on if dependency in dependencies}
+        for name, depends_on in dependencies.items()
+    }
+    tiers = []
+    while remaining:
+        tier = sorted(name for name, depends_on in remaining.items() if not depends_on)
+        if not tier:
+            msg = f"Dependency cycle between {', '.join(sorted(remaining))}"
+            raise ValueError(msg)
+        tiers.append(tier)
+        remaining = {name: depends_on - set(tier) for name, depends_on in remaining.items() if name not in tier}
+    return tiers
+
+
+def apply_waves(
+    waves: dict[str, list[APIObject]],
+    max_workers: int,
+    on_applied: Callable[[str], None] | None = None,
+) -> list[tuple[APIObject, Exception]]:
+    """Create waves of Kubernetes objects, each wave only starting once the previous wave has been created.
+
+    Args:
+        waves (dict[str, list[APIObject]]): The objects to create, grouped into named waves in creation order.
+        max_workers (int): The maximum number of objects to create at once within a wave.
+        on_applied (Callable[[str], None] | None, optional): Called with the name of each wave once it has
+            been created. Defaults to None.
+
+    Returns:
+        list[tuple[APIObject, Exception]]: Every object in the first failing wave which failed to create, later
+            waves are not attempted.
+
+    """
+    for name, wave in waves.items():
+        failures = apply(wave, max_workers=max_workers)
+        for component, error in failures:
+            logger.error(f"Failed to deploy {component.kind}/{component.name} in the {name} wave: {error}")
+        if failures:
+            return failures
+        if on_applied:
+            on_applied(name)
+    return []
@@ -1,5 +1,6 @@
 """Module containing custom Kubernetes resources."""
 
+from kr8s.asyncio.objects import APIObject as AsyncAPIObject
 from kr8s.objects import APIObject
 
 
@@ -13,3 +14,15 @@ class StarbugTest(APIObject):
     singular = "test"
     namespaced = True
     scalable = False
+
+
+class AsyncStarbugTest(AsyncAPIObject):
+    """StarbugTest Class for use with the asyncio kr8s API."""
+
+    version = "bink.com/v1"
+    endpoint = "tests"
+    kind = "StarbugTest"
+    plural = "tests"
+    singular = "test"
+    namespaced = True
+    scalable = False
@@ -1,18 +1,24 @@
 """Defines a Snowstorm Instance."""
 
+from typing import ClassVar
+
 from kr8s.objects import Deployment, Job, ServiceAccount
 
-from starbug.kubernetes import wait_for_migration, wait_for_pod
+from starbug.kubernetes import wait_for_migration
 
 
 class Snowstorm:
     """Defines a Snowstorm Instance."""
 
+    databases: ClassVar[list[str]] = ["snowstorm"]
+    depends_on: ClassVar[list[str]] = ["postgres", "rabbitmq", "redis"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/snowstorm:prod"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Snowstorm class."""
         self.namespace = namespace
         self.name = "snowstorm"
-        self.image = image or "binkcore.azurecr.io/snowstorm:prod"
+        self.image = image or self.default_image
         self.labels = {"app": "snowstorm"}
         self.env = {
             "LINKERD_AWAIT_DISABLED": "true",
@@ -46,11 +52,6 @@ class Snowstorm:
                         },
                         "spec": {
                             "serviceAccountName": self.name,
-                            "initContainers": [
-                                wait_for_pod("postgres"),
-                                wait_for_pod("rabbitmq"),
-                                wait_for_pod("redis"),
-                            ],
                             "containers": [
                                 {
                                     "name": "migrator",
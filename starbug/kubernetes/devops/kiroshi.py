@@ -1,18 +1,24 @@
 """Define a Kiroshi Instance."""
 
+from typing import ClassVar
+
 from kr8s.objects import Deployment, Job, RoleBinding, Service, ServiceAccount
 
-from starbug.kubernetes import get_secret_value, wait_for_migration, wait_for_pod
+from starbug.kubernetes import get_secret_value, wait_for_migration
 
 
 class Kiroshi:
     """Define a Kiroshi Instance."""
 
+    databases: ClassVar[list[str]] = []
+    depends_on: ClassVar[list[str]] = ["postgres"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/kiroshi:prod"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """.Initialize the Kiroshi class."""
         self.namespace = namespace
         self.name = "kiroshi"
-        self.image = image or "binkcore.azurecr.io/kiroshi:prod"
+        self.image = image or self.default_image
         self.labels = {"app": "kiroshi"}
         self.env = {
             "BLOB_STORAGE_ACCOUNT_DSN": get_secret_value("azure-storage", "blob_connection_string_primary"),
@@ -72,7 +78,6 @@ class Kiroshi:
                         "spec": {
                             "restartPolicy": "Never",
                             "serviceAccountName": self.name,
-                            "initContainers": [wait_for_pod("postgres")],
                             "containers": [
                                 {
                                     "name": self.name,
@@ -0,0 +1,168 @@
+"""Resolve container image tags to digests so nodes can reuse pulled images."""
+
+import re
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import monotonic, time
+
+import requests
+from kr8s.objects import APIObject
+from loguru import logger
+
+from starbug.azure import get_credential
+from starbug.metrics import azure_request
+from starbug.settings import settings
+
+versioned_tag = re.compile(r"v?\d+(\.\d+)*([-+][\w.-]+)?")
+manifest_types = (
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+)
+
+
+def parse_image(image: str) -> tuple[str, str, str]:
+    """Split an image reference into its registry, repository and tag.
+
+    Args:
+        image (str): An image reference such as `docker.io/postgres:15` or `binkcore.azurecr.io/hermes:prod`.
+
+    Returns:
+        tuple[str, str, str]: The registry, repository and tag, defaulting to Docker Hub and `latest`.
+
+    """
+    registry, _, remainder = image.partition("/")
+    if not remainder or ("." not in registry and ":" not in registry and registry != "localhost"):
+        registry, remainder = "docker.io", image
+    repository, _, tag = remainder.rpartition(":") if ":" in remainder else (remainder, "", "latest")
+    if registry == "docker.io" and "/" not in repository:
+        repository = f"library/{repository}"
+    return registry, repository, tag
+
+
+def is_immutable(image: str) -> bool:
+    """Return whether an image is pinned to a digest or a version tag, so a cached copy never goes stale."""
+    if "@" in image:
+        return True
+    return bool(versioned_tag.fullmatch(parse_image(image)[2]))
+
+
+def pod_specs(component: APIObject) -> Iterator[dict]:
+    """Yield the pod spec of a Deployment, Job, DaemonSet or CronJob."""
+    spec = component.raw.get("spec", {})
+    if component.kind == "CronJob":
+        spec = spec.get("jobTemplate", {}).get("spec", {})
+    if "template" in spec:
+        yield spec["template"].get("spec", {})
+
+
+class ImageResolver:
+    """A process-wide, TTL-bound cache of image tags resolved to digests through the registry API."""
+
+    def __init__(self, ttl: int = 600) -> None:
+        """Initialize the ImageResolver class.
+
+        Args:
+            ttl (int, optional): Seconds a resolved digest is reused for before the tag is resolved again.
+                Defaults to 600.
+
+        """
+        self.ttl = ttl
+        self.lock = Lock()
+        self.digests: dict[str, tuple[float, str]] = {}
+        self.token_lock = Lock()
+        self.azure_token: tuple[float, str] = (0, "")
+
+    def management_token(self) -> str:
+        """Return an Azure AD token for the management scope, reused until it is five minutes from expiry."""
+        with self.token_lock:
+            if self.azure_token[0] - 300 < time():
+                access_token = get_credential().get_token("https://management.azure.com/.default")
+                self.azure_token = (access_token.expires_on, access_token.token)
+            return self.azure_token[1]
+
+    def token(self, registry: str, challenge: str) -> str:
+        """Return a bearer token for a registry's WWW-Authenticate challenge.
+
+        Azure Container Registries exchange an Azure AD token for a registry token, other registries issue
+        anonymous pull tokens.
+        """
+        params = dict(re.findall(r'(\w+)="([^"]*)"', challenge))
+        realm, service, scope = params.get("realm"), params.get("service"), params.get("scope")
+        if registry.endswith(".azurecr.io"):
+            with azure_request("acr", "exchange_token"):
+                access_token = self.management_token()
+                refresh_token = requests.post(
+                    f"https://{registry}/oauth2/exchange",
+                    data={"grant_type": "access_token", "service": service, "access_token": access_token},
+                    timeout=10,
+                ).json()["refresh_token"]
+                response = requests.post(
+                    realm,
+                    data={
+                        "grant_type": "refresh_token",
+                        "service": service,
+                        "scope": scope,
+                        "refresh_token": refresh_token,
+                    },
+                    timeout=10,
+                )
+            return response.json()["access_token"]
+        response = requests.get(realm, params={"service": service, "scope": scope}, timeout=10)
+        return response.json()["token"]
+
+    def fetch_digest(self, image: str) -> str:
+        """Ask the registry for the digest an image tag currently points at."""
+        registry, repository, tag = parse_image(image)
+        host = "registry-1.docker.io" if registry == "docker.io" else registry
+        url = f"https://{host}/v2/{repository}/manifests/{tag}"
+        headers = {"Accept": ", ".join(manifest_types)}
+        response = requests.head(url, headers=headers, timeout=10)
+        if response.status_code == requests.codes.unauthorized:
+            token = self.token(registry, response.headers.get("WWW-Authenticate", ""))
+            response = requests.head(url, headers=headers | {"Authorization": f"Bearer {token}"}, timeout=10)
+        response.raise_for_status()
+        return response.headers["Docker-Content-Digest"]
+
+    def resolve(self, image: str) -> str | None:
+        """Return an image pinned to the digest its tag points at, or None if it could not be resolved."""
+        if "@" in image:
+            return image
+        with self.lock:
+            expires, digest = self.digests.get(image, (0, ""))
+        if expires < monotonic():
+            try:
+                digest = self.fetch_digest(image)
+            except Exception as error:  # noqa: BLE001
+                logger.warning(f"Failed to resolve a digest for {image}: {error}")
+                return None
+            with self.lock:
+                self.digests[image] = (monotonic() + self.ttl, digest)
+        name = image.rpartition(":")[0] if ":" in image.rpartition("/")[2] else image
+        return f"{name}@{digest}"
+
+    def pin(self, components: Iterable[APIObject], max_workers: int = 8) -> None:
+        """Pin every container image in the components to a digest and pull it only if it is not present.
+
+        Each distinct image is resolved once. Images which cannot be resolved keep their tag, and are still only
+        pulled if not present when the tag is a version, as it will not move.
+        """
+        containers = [
+            container
+            for component in components
+            for spec in pod_specs(component)
+            for container in [*spec.get("initContainers", []), *spec.get("containers", [])]
+        ]
+        images = {container["image"] for container in containers}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="images") as pool:
+            resolved = dict(zip(images, pool.map(self.resolve, images), strict=True))
+        for container in containers:
+            if resolved[container["image"]]:
+                container["image"] = resolved[container["image"]]
+            if is_immutable(container["image"]):
+                container["imagePullPolicy"] = "IfNotPresent"
+
+
+image_resolver = ImageResolver(ttl=settings.image_digest_ttl_in_seconds)
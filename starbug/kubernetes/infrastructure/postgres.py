@@ -1,32 +1,82 @@
 """Define a Postgres Instance."""
 
+from typing import ClassVar
+
 from kr8s.objects import ConfigMap, Deployment, Service, ServiceAccount
 
-from starbug.kubernetes import get_secret_value
+from starbug.kubernetes import get_secret_value, starbug_image
+
+
+def snapshot_container(databases: list[str]) -> dict:
+    """Return an init container definition which downloads the latest Postgres snapshot.
+
+    Disclaimer: this expects a volume called "snapshots" to be mounted at /mnt/snapshots.
+
+    Args:
+        databases (list[str]): The databases to download dumps for.
+
+    """
+    return {
+        "name": "snapshot",
+        "image": starbug_image,
+        "args": ["starbug", "snapshot", "download", "/mnt/snapshots", *databases],
+        "env": [
+            {
+                "name": "STORAGE_ACCOUNT_DSN",
+                "value": get_secret_value("azure-storage", "blob_connection_string_primary"),
+            },
+        ],
+        "volumeMounts": [{"name": "snapshots", "mountPath": "/mnt/snapshots"}],
+    }
 
 
 class Postgres:
-    """Define a Postgres Instance."""
+    """Define a Postgres Instance.
+
+    Databases are restored from the latest snapshot with parallel `pg_restore` where one exists,
+    falling back to copying them from the shared server. Up to `parallelism` databases are seeded at once.
+    """
+
+    available_databases: ClassVar[list[str]] = [
+        "api_reflector",
+        "atlas",
+        "bullsquid",
+        "eos",
+        "europa",
+        "hades",
+        "harmonia",
+        "hermes",
+        "kiroshi",
+        "midas",
+        "snowstorm",
+    ]
+    default_image: ClassVar[str] = "docker.io/postgres:15"
+
+    def __init__(
+        self,
+        namespace: str | None = None,
+        image: str | None = None,
+        databases: list[str] | None = None,
+        parallelism: int = 4,
+    ) -> None:
+        """Initialize the Postgres class.
+
+        Args:
+            namespace (str | None, optional): The namespace to deploy to. Defaults to "default".
+            image (str | None, optional): The Postgres image to run. Defaults to "docker.io/postgres:15".
+            databases (list[str] | None, optional): The databases to seed. Defaults to every available database.
+            parallelism (int, optional): The number of databases to seed at once. Defaults to 4.
 
-    def __init__(self, namespace: str | None = None, image: str | None = None) -> None:
-        """Initialize the Postgres class."""
+        """
         self.namespace = namespace or "default"
-        self.image = image or "docker.io/postgres:15"
+        self.image = image or self.default_image
         self.name = "postgres"
         self.labels = {"app": "postgres"}
         self.databases = [
-            "api_reflector",
-            "atlas",
-            "bullsquid",
-            "eos",
-            "europa",
-            "hades",
-            "harmonia",
-            "hermes",
-            "kiroshi",
-            "midas",
-            "snowstorm",
+            database for database in self.available_databases if databases is None or database in databases
         ]
+        self.parallelism = parallelism
+        self.restore_jobs = 4
 
         self.pg_host = get_secret_value("azure-postgres", "server_host")
         self.pg_user = get_secret_value("azure-postgres", "server_user")
@@ -42,13 +92,25 @@ class Postgres:
                 },
                 "data": {
                     "pgloader.sh": f"""#!/bin/bash
-                        for database in {" ".join(self.databases)}; do
+                        seed() {{
+                        set -eo pipefail
+                        database=$1
+                        if [ -f /mnt/snapshots/$database.dump ]; then
+                        pg_restore --create --no-privileges --no-owner \\
+                            --jobs {self.restore_jobs} \\
+                            --username postgres \\
+                            --dbname postgres /mnt/snapshots/$database.dump
+                        else
                         PGPASSWORD="{self.pg_pass}" pg_dump \\
                             --create --no-privileges --no-owner \\
                             --host "{self.pg_host}" \\
                             --username "{self.pg_user}" \\
                             --dbname $database | psql -U postgres
-                        done
+                        fi
+                        }}
+                        export -f seed
+                        printf '%s\\n' {" ".join(self.databases)} \\
+                            | xargs -r -n 1 -P {self.parallelism} bash -c 'seed "$0"'
                          """,
                 },
             },
@@ -108,7 +170,9 @@ class Postgres:
                                         "name": self.name + "-scripts",
                                     },
                                 },
+                                {"name": "snapshots", "emptyDir": {}},
                             ],
+                            "initContainers": [snapshot_container(self.databases)] if self.databases else [],
                             "containers": [
                                 {
                                     "name": "postgres",
@@ -140,6 +204,7 @@ class Postgres:
                                             "name": "init-script",
                                             "mountPath": "/docker-entrypoint-initdb.d",
                                         },
+                                        {"name": "snapshots", "mountPath": "/mnt/snapshots"},
                                     ],
                                 },
                             ],
@@ -1,15 +1,19 @@
 """Define a RabbitMQ Instance."""
 
+from typing import ClassVar
+
 from kr8s.objects import Deployment, Service, ServiceAccount
 
 
 class RabbitMQ:
     """Define a RabbitMQ Instance."""
 
+    default_image: ClassVar[str] = "docker.io/rabbitmq:3"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the RabbitMQ class."""
         self.namespace = namespace
-        self.image = image or "docker.io/rabbitmq:3"
+        self.image = image or self.default_image
         self.name = "rabbitmq"
         self.labels = {"app": "rabbitmq"}
         self.serviceaccount = ServiceAccount(
@@ -1,15 +1,19 @@
 """Initialize the Redis class."""
 
+from typing import ClassVar
+
 from kr8s.objects import Deployment, Service, ServiceAccount
 
 
 class Redis:
     """Define a Redis Instance."""
 
+    default_image: ClassVar[str] = "docker.io/redis:6"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Redis class."""
         self.namespace = namespace
-        self.image = image or "docker.io/redis:6"
+        self.image = image or self.default_image
         self.name = "redis"
         self.labels = {"app": "redis"}
         self.serviceaccount = ServiceAccount(
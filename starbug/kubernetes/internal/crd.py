@@ -56,6 +56,12 @@ starbug_crd = CustomResourceDefinition(
                                         },
                                         "complete": {"type": "boolean", "default": False},
                                         "results": {"type": "string", "default": ""},
+                                        "namespace": {"type": "string"},
+                                        "timings": {
+                                            "type": "object",
+                                            "additionalProperties": {"type": "string", "format": "date-time"},
+                                        },
+                                        "wave": {"type": "string"},
                                     },
                                 },
                                 "spec": {
@@ -0,0 +1,79 @@
+"""Module for defining the image pre-pull DaemonSet."""
+
+from kr8s.objects import DaemonSet
+
+from starbug.kubernetes.infrastructure.namespace import AITNamespace
+
+
+class Prepull:
+    """Define a DaemonSet which pulls images onto every spot node before tests need them.
+
+    Each image is pulled by an init container which runs a static busybox copied in by the first init container,
+    so images without a shell can be pulled too. The pod then idles on the pause image.
+    """
+
+    def __init__(self, images: list[str], namespace: str | None = None) -> None:
+        """Initialize the Prepull class.
+
+        Args:
+            images (list[str]): The images to pull onto every node.
+            namespace (str | None, optional): The namespace to deploy to. Defaults to "starbug".
+
+        """
+        self.namespace = namespace or "starbug"
+        self.name = "starbug-prepull"
+        self.labels = {"app": "starbug-prepull"}
+        self.images = sorted(images)
+        scheduling = AITNamespace(self.namespace)
+        node_selector_key, _, node_selector_value = scheduling.node_selector.partition("=")
+        self.daemonset = DaemonSet(
+            {
+                "apiVersion": "apps/v1",
+                "kind": "DaemonSet",
+                "metadata": {
+                    "name": self.name,
+                    "namespace": self.namespace,
+                    "labels": self.labels,
+                },
+                "spec": {
+                    "selector": {"matchLabels": self.labels},
+                    "template": {
+                        "metadata": {"labels": self.labels},
+                        "spec": {
+                            "tolerations": scheduling.tolerations,
+                            "nodeSelector": {node_selector_key: node_selector_value},
+                            "initContainers": [
+                                {
+                                    "name": "busybox",
+                                    "image": "docker.io/busybox:stable-musl",
+                                    "command": ["cp", "/bin/busybox", "/prepull/busybox"],
+                                    "volumeMounts": [{"name": "prepull", "mountPath": "/prepull"}],
+                                },
+                                *(
+                                    {
+                                        "name": f"pull-{index}",
+                                        "image": image,
+                                        "command": ["/prepull/busybox", "true"],
+                                        "resources": {"requests": {"cpu": "1m", "memory": "8Mi"}},
+                                        "volumeMounts": [{"name": "prepull", "mountPath": "/prepull"}],
+                                    }
+                                    for index, image in enumerate(self.images)
+                                ),
+                            ],
+                            "containers": [
+                                {
+                                    "name": "pause",
+                                    "image": "registry.k8s.io/pause:3.9",
+                                    "resources": {"requests": {"cpu": "1m", "memory": "8Mi"}},
+                                },
+                            ],
+                            "volumes": [{"name": "prepull", "emptyDir": {}}],
+                        },
+                    },
+                },
+            },
+        )
+
+    def deploy(self) -> tuple[DaemonSet]:
+        """Return all deployable objects as a tuple."""
+        return (self.daemonset,)
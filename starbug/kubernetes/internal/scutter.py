@@ -2,7 +2,7 @@
 
 from kr8s.objects import Role, RoleBinding
 
-from starbug.kubernetes import get_secret_value
+from starbug.kubernetes import get_secret_value, starbug_image
 
 
 def scutter_container(filename: str) -> dict:
@@ -16,8 +16,7 @@ def scutter_container(filename: str) -> dict:
     """
     return {
         "name": "scutter",
-        "image": "binkcore.azurecr.io/starbug:latest",
-        "imagePullPolicy": "Always",
+        "image": starbug_image,
         "args": ["scutter"],
         "env": [
             {
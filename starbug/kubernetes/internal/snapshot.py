@@ -0,0 +1,89 @@
+"""Module for defining Postgres snapshot elements."""
+
+from kr8s.objects import CronJob
+
+from starbug.kubernetes import get_secret_value, starbug_image
+from starbug.kubernetes.infrastructure.postgres import Postgres
+
+
+class PostgresSnapshot:
+    """Define a CronJob which dumps every database from the shared server and uploads them as a snapshot."""
+
+    def __init__(self, namespace: str | None = None, image: str | None = None, schedule: str = "0 3 * * *") -> None:
+        """Initialize the PostgresSnapshot class."""
+        self.namespace = namespace or "starbug"
+        self.schedule = schedule
+        self.image = image or "docker.io/postgres:15"
+        self.name = "postgres-snapshot"
+        self.pg_host = get_secret_value("azure-postgres", "server_host")
+        self.pg_user = get_secret_value("azure-postgres", "server_user")
+        self.pg_pass = get_secret_value("azure-postgres", "server_pass")
+        self.cronjob = CronJob(
+            {
+                "apiVersion": "batch/v1",
+                "kind": "CronJob",
+                "metadata": {
+                    "name": self.name,
+                    "namespace": self.namespace,
+                },
+                "spec": {
+                    "schedule": self.schedule,
+                    "concurrencyPolicy": "Forbid",
+                    "jobTemplate": {
+                        "spec": {
+                            "backoffLimit": 2,
+                            "template": {
+                                "spec": {
+                                    "restartPolicy": "Never",
+                                    "initContainers": [
+                                        {
+                                            "name": "dump",
+                                            "image": self.image,
+                                            "command": ["bash", "-c"],
+                                            "args": [
+                                                f"""set -e
+                                                pids=()
+                                                for database in {" ".join(Postgres.available_databases)}; do
+                                                PGPASSWORD="{self.pg_pass}" pg_dump \\
+                                                    --format custom --no-privileges --no-owner \\
+                                                    --host "{self.pg_host}" \\
+                                                    --username "{self.pg_user}" \\
+                                                    --file /mnt/snapshots/$database.dump \\
+                                                    --dbname $database &
+                                                pids+=($!)
+                                                done
+                                                for pid in "${{pids[@]}}"; do wait $pid; done
+                                                """,
+                                            ],
+                                            "volumeMounts": [{"name": "snapshots", "mountPath": "/mnt/snapshots"}],
+                                        },
+                                    ],
+                                    "containers": [
+                                        {
+                                            "name": "upload",
+                                            "image": starbug_image,
+                                            "args": ["starbug", "snapshot", "upload", "/mnt/snapshots"],
+                                            "env": [
+                                                {
+                                                    "name": "STORAGE_ACCOUNT_DSN",
+                                                    "value": get_secret_value(
+                                                        "azure-storage",
+                                                        "blob_connection_string_primary",
+                                                    ),
+                                                },
+                                            ],
+                                            "volumeMounts": [{"name": "snapshots", "mountPath": "/mnt/snapshots"}],
+                                        },
+                                    ],
+                                    "volumes": [{"name": "snapshots", "emptyDir": {}}],
+                                },
+                            },
+                        },
+                    },
+                },
+            },
+        )
+
+    def deploy(self) -> tuple[CronJob]:
+        """Return all deployable objects as a tuple."""
+        return (self.cronjob,)
@@ -1,18 +1,25 @@
 """Defines a Angelia instance."""
 
+from typing import ClassVar
+
 from kr8s.objects import Deployment, RoleBinding, Service, ServiceAccount
 
-from starbug.kubernetes import get_secret_value, wait_for_migration, wait_for_pod
+from starbug.kubernetes import get_secret_value, wait_for_migration
 
 
 class Angelia:
     """Define an Angelia Instance."""
 
+    identity: ClassVar[str] = "angelia"
+    databases: ClassVar[list[str]] = ["hermes"]
+    depends_on: ClassVar[list[str]] = ["postgres", "rabbitmq", "redis", "hermes"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/angelia:prod"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Angelia class."""
         self.namespace = namespace
         self.name = "angelia"
-        self.image = image or "binkcore.azurecr.io/angelia:prod"
+        self.image = image or self.default_image
         self.labels = {"app": "angelia"}
         self.env = {
             "LINKERD_AWAIT_DISABLED": "true",
@@ -98,12 +105,7 @@ class Angelia:
                         },
                         "spec": {
                             "serviceAccountName": self.name,
-                            "initContainers": [
-                                wait_for_pod("postgres"),
-                                wait_for_pod("rabbitmq"),
-                                wait_for_pod("redis"),
-                                wait_for_migration("hermes"),
-                            ],
+                            "initContainers": [wait_for_migration("hermes")],
                             "containers": [
                                 {
                                     "name": "angelia",
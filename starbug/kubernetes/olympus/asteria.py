@@ -1,18 +1,24 @@
 """Defines a Asteria Instance."""
 
+from typing import ClassVar
+
 from kr8s.objects import Deployment, RoleBinding, ServiceAccount
 
-from starbug.kubernetes import wait_for_migration, wait_for_pod
+from starbug.kubernetes import wait_for_migration
 
 
 class Asteria:
     """Defines a Asteria Instance."""
 
+    databases: ClassVar[list[str]] = ["hermes"]
+    depends_on: ClassVar[list[str]] = ["postgres", "rabbitmq", "redis", "hermes"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/asteria:latest"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Asteria class."""
         self.namespace = namespace
         self.name = "asteria"
-        self.image = image or "binkcore.azurecr.io/asteria:latest"
+        self.image = image or self.default_image
         self.labels = {"app": "asteria"}
         self.env = {
             "LINKERD_AWAIT_DISABLED": "true",
@@ -73,12 +79,7 @@ class Asteria:
                         },
                         "spec": {
                             "serviceAccountName": self.name,
-                            "initContainers": [
-                                wait_for_pod("postgres"),
-                                wait_for_pod("rabbitmq"),
-                                wait_for_pod("redis"),
-                                wait_for_migration("hermes"),
-                            ],
+                            "initContainers": [wait_for_migration("hermes")],
                             "containers": [
                                 {
                                     "name": self.name,
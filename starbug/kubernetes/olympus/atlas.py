@@ -1,18 +1,24 @@
 """Defines a Atlas Instance."""
 
+from typing import ClassVar
+
 from kr8s.objects import Deployment, Job, RoleBinding, Service, ServiceAccount
 
-from starbug.kubernetes import wait_for_migration, wait_for_pod
+from starbug.kubernetes import wait_for_migration
 
 
 class Atlas:
     """Defines a Atlas Instance."""
 
+    databases: ClassVar[list[str]] = ["atlas"]
+    depends_on: ClassVar[list[str]] = ["postgres", "rabbitmq"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/atlas:prod"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Atlas class."""
         self.namespace = namespace
         self.name = "atlas"
-        self.image = image or "binkcore.azurecr.io/atlas:prod"
+        self.image = image or self.default_image
         self.labels = {"app": "atlas"}
         self.env = {
             "LINKERD_AWAIT_DISABLED": "true",
@@ -90,7 +96,6 @@ class Atlas:
                         "spec": {
                             "restartPolicy": "Never",
                             "serviceAccountName": self.name,
-                            "initContainers": [wait_for_pod("postgres")],
                             "containers": [
                                 {
                                     "name": self.name,
@@ -131,11 +136,7 @@ class Atlas:
                         },
                         "spec": {
                             "serviceAccountName": self.name,
-                            "initContainers": [
-                                wait_for_pod("postgres"),
-                                wait_for_pod("rabbitmq"),
-                                wait_for_migration("atlas"),
-                            ],
+                            "initContainers": [wait_for_migration("atlas")],
                             "containers": [
                                 {
                                     "name": "api",
@@ -1,18 +1,24 @@
 """Defines a Boreas Instance."""
 
+from typing import ClassVar
+
 from kr8s.objects import Deployment, RoleBinding, Service, ServiceAccount
 
-from starbug.kubernetes import get_secret_value, wait_for_pod
+from starbug.kubernetes import get_secret_value
 
 
 class Boreas:
     """Defines a Boreas Instance."""
 
+    identity: ClassVar[str] = "boreas"
+    depends_on: ClassVar[list[str]] = ["rabbitmq"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/boreas:prod"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Boreas class."""
         self.namespace = namespace
         self.name = "boreas"
-        self.image = image or "binkcore.azurecr.io/boreas:prod"
+        self.image = image or self.default_image
         self.labels = {"app": "boreas"}
         self.env = {
             "LINKERD_AWAIT_DISABLED": "true",
@@ -93,7 +99,6 @@ class Boreas:
                         },
                         "spec": {
                             "serviceAccountName": self.name,
-                            "initContainers": [wait_for_pod("rabbitmq")],
                             "containers": [
                                 {
                                     "name": self.name,
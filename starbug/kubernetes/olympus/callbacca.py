@@ -1,18 +1,21 @@
 """Defines a Callbacca Instance."""
 
-from kr8s.objects import Deployment, RoleBinding, ServiceAccount
+from typing import ClassVar
 
-from starbug.kubernetes import wait_for_pod
+from kr8s.objects import Deployment, RoleBinding, ServiceAccount
 
 
 class Callbacca:
     """Defines a Callbacca Instance."""
 
+    depends_on: ClassVar[list[str]] = ["redis"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/callbacca:latest"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Callbacca class."""
         self.namespace = namespace
         self.name = "callbacca"
-        self.image = image or "binkcore.azurecr.io/callbacca:latest"
+        self.image = image or self.default_image
         self.labels = {"app": "callbacca"}
         self.env = {
             "REDIS_URL": "redis://redis:6379/0",
@@ -72,7 +75,6 @@ class Callbacca:
                         },
                         "spec": {
                             "serviceAccountName": self.name,
-                            "initContainers": [wait_for_pod("redis")],
                             "containers": [
                                 {
                                     "name": self.name,
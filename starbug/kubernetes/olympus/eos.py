@@ -1,18 +1,25 @@
 """Defines an Eos Instance."""
 
+from typing import ClassVar
+
 from kr8s.objects import Deployment, Job, RoleBinding, Service, ServiceAccount
 
-from starbug.kubernetes import get_secret_value, wait_for_migration, wait_for_pod
+from starbug.kubernetes import get_secret_value, wait_for_migration
 
 
 class Eos:
     """Defines an Eos Instance."""
 
+    identity: ClassVar[str] = "eos"
+    databases: ClassVar[list[str]] = ["eos"]
+    depends_on: ClassVar[list[str]] = ["postgres", "redis"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/eos:prod"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Eos class."""
         self.namespace = namespace
         self.name = "eos"
-        self.image = image or "binkcore.azurecr.io/eos:prod"
+        self.image = image or self.default_image
         self.labels = {"app": "eos"}
         self.env = {
             "LINKERD_AWAIT_DISABLED": "true",
@@ -96,7 +103,6 @@ class Eos:
                         "spec": {
                             "restartPolicy": "Never",
                             "serviceAccountName": self.name,
-                            "initContainers": [wait_for_pod("postgres"), wait_for_pod("redis")],
                             "containers": [
                                 {
                                     "name": self.name,
@@ -137,11 +143,7 @@ class Eos:
                         },
                         "spec": {
                             "serviceAccountName": self.name,
-                            "initContainers": [
-                                wait_for_pod("postgres"),
-                                wait_for_pod("redis"),
-                                wait_for_migration("eos"),
-                            ],
+                            "initContainers": [wait_for_migration("eos")],
                             "containers": [
                                 {
                                     "name": self.name,
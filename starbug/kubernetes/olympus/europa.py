@@ -1,18 +1,25 @@
 """Defines a Europa Instance."""
 
+from typing import ClassVar
+
 from kr8s.objects import Deployment, Job, RoleBinding, Service, ServiceAccount
 
-from starbug.kubernetes import get_secret_value, wait_for_migration, wait_for_pod
+from starbug.kubernetes import get_secret_value, wait_for_migration
 
 
 class Europa:
     """Defines a Europa Instance."""
 
+    identity: ClassVar[str] = "europa"
+    databases: ClassVar[list[str]] = ["europa"]
+    depends_on: ClassVar[list[str]] = ["postgres"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/europa:prod"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Europa class."""
         self.namespace = namespace
         self.name = "europa"
-        self.image = image or "binkcore.azurecr.io/europa:prod"
+        self.image = image or self.default_image
         self.labels = {"app": "europa"}
         self.env = {
             "LINKERD_AWAIT_DISABLED": "true",
@@ -92,7 +99,6 @@ class Europa:
                         "spec": {
                             "restartPolicy": "Never",
                             "serviceAccountName": self.name,
-                            "initContainers": [wait_for_pod("postgres")],
                             "containers": [
                                 {
                                     "name": self.name,
@@ -133,7 +139,7 @@ class Europa:
                         },
                         "spec": {
                             "serviceAccountName": self.name,
-                            "initContainers": [wait_for_pod("postgres"), wait_for_migration("europa")],
+                            "initContainers": [wait_for_migration("europa")],
                             "containers": [
                                 {
                                     "name": self.name,
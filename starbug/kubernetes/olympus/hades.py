@@ -1,18 +1,24 @@
 """Defines a Hades Instance."""
 
+from typing import ClassVar
+
 from kr8s.objects import Deployment, Job, RoleBinding, Service, ServiceAccount
 
-from starbug.kubernetes import wait_for_migration, wait_for_pod
+from starbug.kubernetes import wait_for_migration
 
 
 class Hades:
     """Defines a Hades Instance."""
 
+    databases: ClassVar[list[str]] = ["hades"]
+    depends_on: ClassVar[list[str]] = ["postgres"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/hades:prod"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Hades class."""
         self.namespace = namespace
         self.name = "hades"
-        self.image = image or "binkcore.azurecr.io/hades:prod"
+        self.image = image or self.default_image
         self.labels = {"app": "hades"}
         self.env = {
             "LINKERD_AWAIT_DISABLED": "true",
@@ -88,7 +94,6 @@ class Hades:
                         "spec": {
                             "serviceAccountName": self.name,
                             "restartPolicy": "Never",
-                            "initContainers": [wait_for_pod("postgres")],
                             "containers": [
                                 {
                                     "name": self.name,
@@ -133,7 +138,7 @@ class Hades:
                         },
                         "spec": {
                             "serviceAccountName": self.name,
-                            "initContainers": [wait_for_pod("postgres"), wait_for_migration("hades")],
+                            "initContainers": [wait_for_migration("hades")],
                             "containers": [
                                 {
                                     "name": self.name,
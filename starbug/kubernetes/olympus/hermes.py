@@ -1,18 +1,25 @@
 """Defines a Hermes Instance."""
 
+from typing import ClassVar
+
 from kr8s.objects import Deployment, Job, RoleBinding, Service, ServiceAccount
 
-from starbug.kubernetes import get_secret_value, wait_for_migration, wait_for_pod
+from starbug.kubernetes import get_secret_value, pushgateway_image, wait_for_migration
 
 
 class Hermes:
     """Defines a Hermes Instance."""
 
+    identity: ClassVar[str] = "hermes"
+    databases: ClassVar[list[str]] = ["hermes"]
+    depends_on: ClassVar[list[str]] = ["postgres", "rabbitmq", "redis"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/hermes:prod"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Hermes class."""
         self.namespace = namespace
         self.name = "hermes"
-        self.image = image or "binkcore.azurecr.io/hermes:prod"
+        self.image = image or self.default_image
         self.labels = {"app": "hermes"}
         self.env = {
             "LINKERD_AWAIT_DISABLED": "true",
@@ -107,11 +114,6 @@ class Hermes:
                         "spec": {
                             "serviceAccountName": self.name,
                             "restartPolicy": "Never",
-                            "initContainers": [
-                                wait_for_pod("postgres"),
-                                wait_for_pod("rabbitmq"),
-                                wait_for_pod("redis"),
-                            ],
                             "containers": [
                                 {
                                     "name": self.name,
@@ -152,12 +154,7 @@ class Hermes:
                         },
                         "spec": {
                             "serviceAccountName": self.name,
-                            "initContainers": [
-                                wait_for_pod("postgres"),
-                                wait_for_pod("rabbitmq"),
-                                wait_for_pod("redis"),
-                                wait_for_migration("hermes"),
-                            ],
+                            "initContainers": [wait_for_migration("hermes")],
                             "containers": [
                                 {
                                     "name": "api",
@@ -234,7 +231,7 @@ class Hermes:
                                 },
                                 {
                                     "name": "pushgateway",
-                                    "image": "prom/pushgateway:v1.6.2",
+                                    "image": pushgateway_image,
                                     "imagePullPolicy": "IfNotPresent",
                                     "args": ["--web.listen-address=0.0.0.0:9100"],
                                     "ports": [
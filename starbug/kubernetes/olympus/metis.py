@@ -1,18 +1,23 @@
 """Defines a Metis Instance."""
 
+from typing import ClassVar
+
 from kr8s.objects import Deployment, RoleBinding, Service, ServiceAccount
 
-from starbug.kubernetes import get_secret_value
+from starbug.kubernetes import get_secret_value, pushgateway_image
 
 
 class Metis:
     """Defines a Metis Instance."""
 
+    identity: ClassVar[str] = "metis"
+    default_image: ClassVar[str] = "binkcore.azurecr.io/metis:prod"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Metis class."""
         self.namespace = namespace
         self.name = "metis"
-        self.image = image or "binkcore.azurecr.io/metis:prod"
+        self.image = image or self.default_image
         self.labels = {"app": "metis"}
         self.env = {
             "LINKERD_AWAIT_DISABLED": "true",
@@ -132,7 +137,7 @@ class Metis:
                                 },
                                 {
                                     "name": "pushgateway",
-                                    "image": "prom/pushgateway:v1.6.2",
+                                    "image": pushgateway_image,
                                     "imagePullPolicy": "IfNotPresent",
                                     "args": ["--web.listen-address=0.0.0.0:9100"],
                                     "ports": [{"name": "metrics", "containerPort": 9100}],
@@ -1,18 +1,25 @@
 """Defines a Midas Instance."""
 
+from typing import ClassVar
+
 from kr8s.objects import Deployment, Job, RoleBinding, Service, ServiceAccount
 
-from starbug.kubernetes import get_secret_value, wait_for_migration, wait_for_pod
+from starbug.kubernetes import get_secret_value, pushgateway_image, wait_for_migration
 
 
 class Midas:
     """Defines a Midas Instance."""
 
+    identity: ClassVar[str] = "midas"
+    databases: ClassVar[list[str]] = ["midas"]
+    depends_on: ClassVar[list[str]] = ["postgres", "rabbitmq", "redis"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/midas:prod"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Midas class."""
         self.namespace = namespace
         self.name = "midas"
-        self.image = image or "binkcore.azurecr.io/midas:prod"
+        self.image = image or self.default_image
         self.labels = {"app": "midas"}
         self.env = {
             "LINKERD_AWAIT_DISABLED": "true",
@@ -99,11 +106,6 @@ class Midas:
                             },
                         },
                         "spec": {
-                            "initContainers": [
-                                wait_for_pod("postgres"),
-                                wait_for_pod("rabbitmq"),
-                                wait_for_pod("redis"),
-                            ],
                             "containers": [
                                 {
                                     "name": self.name,
@@ -146,12 +148,7 @@ class Midas:
                         },
                         "spec": {
                             "serviceAccountName": self.name,
-                            "initContainers": [
-                                wait_for_pod("postgres"),
-                                wait_for_pod("rabbitmq"),
-                                wait_for_pod("redis"),
-                                wait_for_migration("midas"),
-                            ],
+                            "initContainers": [wait_for_migration("midas")],
                             "containers": [
                                 {
                                     "name": self.name,
@@ -228,7 +225,7 @@ class Midas:
                                 },
                                 {
                                     "name": "pushgateway",
-                                    "image": "prom/pushgateway:v1.6.2",
+                                    "image": pushgateway_image,
                                     "imagePullPolicy": "IfNotPresent",
                                     "args": ["--web.listen-address=0.0.0.0:9100"],
                                     "ports": [
@@ -1,18 +1,21 @@
 """Defines a Pelops Instance."""
 
-from kr8s.objects import Deployment, RoleBinding, Service, ServiceAccount
+from typing import ClassVar
 
-from starbug.kubernetes import wait_for_pod
+from kr8s.objects import Deployment, RoleBinding, Service, ServiceAccount
 
 
 class Pelops:
     """Defines a Pelops Instance."""
 
+    depends_on: ClassVar[list[str]] = ["redis"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/pelops:latest"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Pelops class."""
         self.namespace = namespace
         self.name = "pelops"
-        self.image = image or "binkcore.azurecr.io/pelops:latest"
+        self.image = image or self.default_image
         self.labels = {"app": "pelops"}
         self.env = {
             "LINKERD_AWAIT_DISABLED": "true",
@@ -89,7 +92,6 @@ class Pelops:
                         },
                         "spec": {
                             "serviceAccountName": self.name,
-                            "initContainers": [wait_for_pod("redis")],
                             "containers": [
                                 {
                                     "name": self.name,
@@ -1,18 +1,21 @@
 """Defines a Plutus Instance."""
 
-from kr8s.objects import Deployment, RoleBinding, ServiceAccount
+from typing import ClassVar
 
-from starbug.kubernetes import wait_for_pod
+from kr8s.objects import Deployment, RoleBinding, ServiceAccount
 
 
 class Plutus:
     """Defines a Plutus Instance."""
 
+    depends_on: ClassVar[list[str]] = ["rabbitmq", "redis"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/plutus:prod"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Plutus class."""
         self.namespace = namespace
         self.name = "plutus"
-        self.image = image or "binkcore.azurecr.io/plutus:prod"
+        self.image = image or self.default_image
         self.labels = {"app": "plutus"}
         self.env = {
             "LINKERD_AWAIT_DISABLED": "true",
@@ -78,7 +81,6 @@ class Plutus:
                             },
                         },
                         "spec": {
-                            "initContainers": [wait_for_pod("rabbitmq"), wait_for_pod("redis")],
                             "containers": [
                                 {
                                     "name": "consumer",
@@ -1,18 +1,21 @@
 """Defines a Skiron Instance."""
 
-from kr8s.objects import Deployment, RoleBinding, Service, ServiceAccount
+from typing import ClassVar
 
-from starbug.kubernetes import wait_for_pod
+from kr8s.objects import Deployment, RoleBinding, Service, ServiceAccount
 
 
 class Skiron:
     """Defines a Skiron Instance."""
 
+    depends_on: ClassVar[list[str]] = ["rabbitmq"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/skiron:latest"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Skiron class."""
         self.namespace = namespace
         self.name = "skiron"
-        self.image = image or "binkcore.azurecr.io/skiron:latest"
+        self.image = image or self.default_image
         self.labels = {"app": "skiron"}
         self.env = {
             "LINKERD_AWAIT_DISABLED": "true",
@@ -87,7 +90,6 @@ class Skiron:
                         },
                         "spec": {
                             "serviceAccountName": self.name,
-                            "initContainers": [wait_for_pod("rabbitmq")],
                             "containers": [
                                 {
                                     "name": self.name,
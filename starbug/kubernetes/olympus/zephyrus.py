@@ -1,18 +1,24 @@
 """Defines a Zephyrus Instance."""
 
+from typing import ClassVar
+
 from kr8s.objects import Deployment, RoleBinding, Service, ServiceAccount
 
-from starbug.kubernetes import get_secret_value, wait_for_pod
+from starbug.kubernetes import get_secret_value
 
 
 class Zephyrus:
     """Defines a Zephyrus Instance."""
 
+    identity: ClassVar[str] = "zephyrus"
+    depends_on: ClassVar[list[str]] = ["rabbitmq"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/zephyrus:prod"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Zephyrus class."""
         self.namespace = namespace
         self.name = "zephyrus"
-        self.image = image or "binkcore.azurecr.io/zephyrus:prod"
+        self.image = image or self.default_image
         self.labels = {"app": "zephyrus"}
         self.env = {
             "LINKERD_AWAIT_DISABLED": "true",
@@ -96,7 +102,6 @@ class Zephyrus:
                         },
                         "spec": {
                             "serviceAccountName": self.name,
-                            "initContainers": [wait_for_pod("rabbitmq")],
                             "containers": [
                                 {
                                     "name": self.name,
@@ -0,0 +1,239 @@
+"""Build a service's manifests from a compact, declarative spec expanded once into a template.
+
+A spec only describes what differs between a service's workloads. It is expanded into full manifests once, with
+`${namespace}`, `${image}` and one placeholder per secret left in place, and every test then stamps its own values
+into a copy of that template.
+"""
+
+import copy
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from string import Template as StringTemplate
+from threading import Lock
+
+from kr8s.objects import APIObject, Deployment, Job, RoleBinding, Service, ServiceAccount
+
+from starbug.kubernetes import get_secret_value, wait_for_migration
+
+kinds: dict[str, type[APIObject]] = {
+    "ServiceAccount": ServiceAccount,
+    "RoleBinding": RoleBinding,
+    "Job": Job,
+    "Service": Service,
+    "Deployment": Deployment,
+}
+
+
+@dataclass(frozen=True)
+class Workload:
+    """A Deployment of a service, running the service's image with its own arguments."""
+
+    component: str
+    args: list[str]
+    env: dict[str, str] = field(default_factory=dict)
+    port: int | None = None
+
+
+@dataclass(frozen=True)
+class Spec:
+    """A service made up of a migration Job and a Deployment per workload, sharing a ServiceAccount and env.
+
+    Values may reference `${namespace}`, `${image}` and any name in `secrets`, which maps a placeholder to the
+    Secret name and key its value is read from when the template is rendered. `secrets` must include `client_id`,
+    the service's workload identity. A literal `$` is written `$$`.
+    """
+
+    name: str
+    env: dict[str, str]
+    migrate: list[str]
+    workloads: list[Workload]
+    secrets: dict[str, tuple[str, str]]
+
+    def labels(self, workload: Workload | None = None) -> dict[str, str]:
+        """Return the labels of the service, or of one of its workloads."""
+        return {"app": self.name} | ({"component": workload.component} if workload else {})
+
+    def environment(self, workload: Workload | None = None) -> list[dict[str, str]]:
+        """Return the env of a container, the service's env followed by the workload's own."""
+        env = self.env | (workload.env if workload else {})
+        return [{"name": k, "value": v} for k, v in env.items()]
+
+    def security_context(self) -> dict[str, int]:
+        """Return the security context every container of the service runs with."""
+        return {"runAsGroup": 10000, "runAsUser": 10000}
+
+    def serviceaccount(self) -> dict:
+        """Return the ServiceAccount manifest, federated with the service's workload identity."""
+        return {
+            "apiVersion": "v1",
+            "kind": "ServiceAccount",
+            "metadata": {
+                "annotations": {"azure.workload.identity/client-id": "${client_id}"},
+                "name": self.name,
+                "namespace": "${namespace}",
+            },
+        }
+
+    def rolebinding(self) -> dict:
+        """Return the RoleBinding manifest which lets the ServiceAccount wait for the migration Job."""
+        return {
+            "apiVersion": "rbac.authorization.k8s.io/v1",
+            "kind": "RoleBinding",
+            "metadata": {"name": self.name + "-k8s-wait-for", "namespace": "${namespace}"},
+            "roleRef": {"apiGroup": "rbac.authorization.k8s.io", "kind": "Role", "name": "k8s-wait-for"},
+            "subjects": [{"kind": "ServiceAccount", "name": self.name, "namespace": "${namespace}"}],
+        }
+
+    def migrator(self) -> dict:
+        """Return the migration Job manifest."""
+        return {
+            "apiVersion": "batch/v1",
+            "kind": "Job",
+            "metadata": {"name": self.name + "-migrator", "namespace": "${namespace}", "labels": self.labels()},
+            "spec": {
+                "template": {
+                    "metadata": {
+                        "labels": self.labels(),
+                        "annotations": {"kubectl.kubernetes.io/default-container": self.name},
+                    },
+                    "spec": {
+                        "serviceAccountName": self.name,
+                        "restartPolicy": "Never",
+                        "containers": [
+                            {
+                                "name": self.name,
+                                "image": "${image}",
+                                "env": self.environment(),
+                                "args": list(self.migrate),
+                                "securityContext": self.security_context(),
+                            },
+                        ],
+                    },
+                },
+            },
+        }
+
+    def service(self, workload: Workload) -> dict:
+        """Return the Service manifest exposing a workload's port on port 80."""
+        return {
+            "apiVersion": "v1",
+            "kind": "Service",
+            "metadata": {
+                "name": f"{self.name}-{workload.component}",
+                "namespace": "${namespace}",
+                "labels": self.labels(workload),
+            },
+            "spec": {"ports": [{"port": 80, "targetPort": workload.port}], "selector": self.labels(workload)},
+        }
+
+    def deployment(self, workload: Workload) -> dict:
+        """Return the Deployment manifest of a workload, started once the migration Job completes."""
+        container = {
+            "name": "app",
+            "image": "${image}",
+            "imagePullPolicy": "Always",
+            "args": list(workload.args),
+            "env": self.environment(workload),
+            "securityContext": self.security_context(),
+        }
+        if workload.port:
+            container["ports"] = [{"containerPort": workload.port}]
+        return {
+            "apiVersion": "apps/v1",
+            "kind": "Deployment",
+            "metadata": {
+                "name": f"{self.name}-{workload.component}",
+                "namespace": "${namespace}",
+                "labels": self.labels(workload),
+            },
+            "spec": {
+                "replicas": 1,
+                "selector": {"matchLabels": self.labels(workload)},
+                "template": {
+                    "metadata": {
+                        "labels": self.labels(workload),
+                        "annotations": {"kubectl.kubernetes.io/default-container": "app"},
+                    },
+                    "spec": {
+                        "serviceAccountName": self.name,
+                        "initContainers": [wait_for_migration(self.name)],
+                        "containers": [container],
+                    },
+                },
+            },
+        }
+
+    def manifests(self) -> list[dict]:
+        """Return every manifest of the service, with placeholders left in place."""
+        return [
+            self.serviceaccount(),
+            self.rolebinding(),
+            self.migrator(),
+            *(self.service(workload) for workload in self.workloads if workload.port),
+            *(self.deployment(workload) for workload in self.workloads),
+        ]
+
+
+def placeholders(value: object, path: tuple[str | int, ...] = ()) -> Iterator[tuple[tuple[str | int, ...], str]]:
+    """Yield the path to, and value of, every string in a manifest which contains a placeholder."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from placeholders(item, (*path, key))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from placeholders(item, (*path, index))
+    elif isinstance(value, str) and "$" in value:
+        yield path, value
+
+
+class Template:
+    """A Spec expanded once into manifests, copied and stamped with each render's own values.
+
+    Only the strings which contain a placeholder are substituted, so every render gets its own copy of the
+    manifests which can be changed independently.
+    """
+
+    def __init__(self, spec: Spec) -> None:
+        """Initialize the Template class.
+
+        Args:
+            spec (Spec): The service to expand.
+
+        """
+        self.spec = spec
+        self.lock = Lock()
+        self.expanded: tuple[list[dict], list[tuple[tuple[str | int, ...], StringTemplate]]] | None = None
+
+    def expand(self) -> tuple[list[dict], list[tuple[tuple[str | int, ...], StringTemplate]]]:
+        """Return the manifests and where their placeholders are, expanding the Spec the first time."""
+        with self.lock:
+            if self.expanded is None:
+                manifests = self.spec.manifests()
+                self.expanded = (
+                    manifests,
+                    [(path, StringTemplate(value)) for path, value in placeholders(manifests)],
+                )
+            return self.expanded
+
+    def render(self, namespace: str, image: str) -> tuple[APIObject, ...]:
+        """Return the service's objects for a namespace and image, with secrets read from the cluster.
+
+        Args:
+            namespace (str): The namespace to deploy to.
+            image (str): The image every container of the service runs.
+
+        Returns:
+            tuple[APIObject, ...]: The ServiceAccount, RoleBinding, migration Job, Services and Deployments.
+
+        """
+        expanded, templates = self.expand()
+        values = {"namespace": namespace, "image": image} | {
+            placeholder: get_secret_value(name, key) for placeholder, (name, key) in self.spec.secrets.items()
+        }
+        manifests = copy.deepcopy(expanded)
+        for path, template in templates:
+            parent = manifests
+            for key in path[:-1]:
+                parent = parent[key]
+            parent[path[-1]] = template.substitute(values)
+        return tuple(kinds[manifest["kind"]](manifest) for manifest in manifests)
@@ -1,19 +1,23 @@
 """Provides a test suite for Kiroshi."""
 
+from typing import ClassVar
+
 from kr8s.objects import Job, Role, RoleBinding, ServiceAccount
 
-from starbug.kubernetes import wait_for_pod
 from starbug.kubernetes.internal.scutter import scutter_container, scutter_role, scutter_rolebinding
 
 
 class TestKiroshi:
     """Provides a test suite for Kiroshi."""
 
+    depends_on: ClassVar[list[str]] = ["kiroshi"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/kiroshi-test:latest"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the TestKiroshi Class."""
         self.name = "test-kiroshi"
         self.namespace = namespace
-        self.image = image or "binkcore.azurecr.io/kiroshi-test:latest"
+        self.image = image or self.default_image
         self.serviceaccount = ServiceAccount(
             {
                 "apiVersion": "v1",
@@ -57,6 +61,7 @@ class TestKiroshi:
                     "namespace": self.namespace,
                     "labels": {
                         "app": self.name,
+                        "bink.com/starbug": "test",
                     },
                 },
                 "spec": {
@@ -72,7 +77,6 @@ class TestKiroshi:
                         },
                         "spec": {
                             "serviceAccountName": self.name,
-                            "initContainers": [wait_for_pod("kiroshi")],
                             "containers": [
                                 {
                                     "name": "test",
@@ -1,19 +1,26 @@
 """Provides a pytest based test suite."""
 
+from typing import ClassVar
+
 from kr8s.objects import Job, Role, RoleBinding, ServiceAccount
 
-from starbug.kubernetes import get_secret_value, wait_for_pod
+from starbug.kubernetes import get_secret_value
 from starbug.kubernetes.internal.scutter import scutter_container, scutter_role, scutter_rolebinding
 
 
 class Pytest:
     """Provides a pytest based test suite."""
 
+    identity: ClassVar[str] = "pytest"
+    databases: ClassVar[list[str]] = ["hermes", "harmonia", "snowstorm"]
+    depends_on: ClassVar[list[str]] = ["angelia"]
+    default_image: ClassVar[str] = "binkcore.azurecr.io/pyqa-apiv2:staging"
+
     def __init__(self, namespace: str, image: str | None = None) -> None:
         """Initialize the Pytest Class."""
         self.name = "pytest"
         self.namespace = namespace
-        self.image = image or "binkcore.azurecr.io/pyqa-apiv2:staging"
+        self.image = image or self.default_image
         self.env = {
             "BLOB_STORAGE_ACCOUNT_DSN": get_secret_value("azure-storage", "blob_connection_string_primary"),
             "HERMES_DATABASE_URI": "postgresql://postgres@postgres:5432/hermes",
@@ -67,6 +74,7 @@ class Pytest:
                     "namespace": self.namespace,
                     "labels": {
                         "app": self.name,
+                        "bink.com/starbug": "test",
                     },
                 },
                 "spec": {
@@ -80,7 +88,6 @@ class Pytest:
                         },
                         "spec": {
                             "serviceAccountName": self.name,
-                            "initContainers": [wait_for_pod("angelia")],
                             "containers": [
                                 {
                                     "name": "test",
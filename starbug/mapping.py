@@ -1,57 +1,108 @@
-"""Provides a simple mapping of classes to their names."""
-
-from starbug.kubernetes.data.snowstorm import Snowstorm
-from starbug.kubernetes.devops.kiroshi import Kiroshi
-from starbug.kubernetes.infrastructure.postgres import Postgres
-from starbug.kubernetes.infrastructure.rabbitmq import RabbitMQ
-from starbug.kubernetes.infrastructure.redis import Redis
-from starbug.kubernetes.olympus.angelia import Angelia
-from starbug.kubernetes.olympus.asteria import Asteria
-from starbug.kubernetes.olympus.atlas import Atlas
-from starbug.kubernetes.olympus.boreas import Boreas
-from starbug.kubernetes.olympus.callbacca import Callbacca
-from starbug.kubernetes.olympus.eos import Eos
-from starbug.kubernetes.olympus.europa import Europa
-from starbug.kubernetes.olympus.hades import Hades
-from starbug.kubernetes.olympus.harmonia import Harmonia
-from starbug.kubernetes.olympus.hermes import Hermes
-from starbug.kubernetes.olympus.metis import Metis
-from starbug.kubernetes.olympus.midas import Midas
-from starbug.kubernetes.olympus.pelops import Pelops
-from starbug.kubernetes.olympus.plutus import Plutus
-from starbug.kubernetes.olympus.skiron import Skiron
-from starbug.kubernetes.olympus.zephyrus import Zephyrus
-from starbug.kubernetes.tests.kiroshi import TestKiroshi
-from starbug.kubernetes.tests.pytest import Pytest
-
-infrastructure_mapping = {
-    "postgres": Postgres,
-    "redis": Redis,
-    "rabbitmq": RabbitMQ,
-}
-
-application_mapping = {
-    "angelia": Angelia,
-    "atlas": Atlas,
-    "asteria": Asteria,
-    "boreas": Boreas,
-    "callbacca": Callbacca,
-    "eos": Eos,
-    "europa": Europa,
-    "hades": Hades,
-    "harmonia": Harmonia,
-    "hermes": Hermes,
-    "kiroshi": Kiroshi,
-    "metis": Metis,
-    "midas": Midas,
-    "pelops": Pelops,
-    "plutus": Plutus,
-    "snowstorm": Snowstorm,
-    "skiron": Skiron,
-    "zephyrus": Zephyrus,
-}
-
-test_mapping = {
-    "test_kiroshi": TestKiroshi,
-    "test_pytest": Pytest,
-}
+"""Provides a simple mapping of classes to their names.
+
+Classes are only imported the first time they are looked up, so listing or validating names imports nothing.
+Third-party components can be added through the `starbug.infrastructure`, `starbug.applications` and
+`starbug.tests` entry point groups, each entry point naming a component class.
+"""
+
+from collections.abc import Iterator, Mapping
+from importlib import import_module
+from importlib.metadata import EntryPoint, entry_points
+from threading import Lock
+
+
+class Registry(Mapping[str, type]):
+    """A read-only mapping of names to component classes, importing each class on first lookup."""
+
+    def __init__(self, group: str, components: dict[str, str]) -> None:
+        """Initialize the Registry class.
+
+        Args:
+            group (str): The entry point group third-party components are registered under.
+            components (dict[str, str]): Built-in components, as names mapped to `module:Class` import strings.
+
+        """
+        self.group = group
+        self.components: dict[str, str | EntryPoint] = dict(components)
+        self.classes: dict[str, type] = {}
+        self.lock = Lock()
+        self.discovered = False
+
+    def discover(self) -> None:
+        """Add the components registered under this registry's entry point group, built-in names take precedence."""
+        with self.lock:
+            if self.discovered:
+                return
+            for entry_point in entry_points(group=self.group):
+                self.components.setdefault(entry_point.name, entry_point)
+            self.discovered = True
+
+    def __getitem__(self, name: str) -> type:
+        """Return the class for a component name, importing it if this is the first lookup."""
+        if name in self.classes:
+            return self.classes[name]
+        self.discover()
+        component = self.components[name]
+        if isinstance(component, EntryPoint):
+            self.classes[name] = component.load()
+        else:
+            module, _, attribute = component.partition(":")
+            self.classes[name] = getattr(import_module(module), attribute)
+        return self.classes[name]
+
+    def __contains__(self, name: object) -> bool:
+        """Return whether a component name is registered, without importing it."""
+        self.discover()
+        return name in self.components
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the registered component names."""
+        self.discover()
+        return iter(self.components)
+
+    def __len__(self) -> int:
+        """Return the number of registered components."""
+        self.discover()
+        return len(self.components)
+
+
+infrastructure_mapping = Registry(
+    "starbug.infrastructure",
+    {
+        "postgres": "starbug.kubernetes.infrastructure.postgres:Postgres",
+        "redis": "starbug.kubernetes.infrastructure.redis:Redis",
+        "rabbitmq": "starbug.kubernetes.infrastructure.rabbitmq:RabbitMQ",
+    },
+)
+
+application_mapping = Registry(
+    "starbug.applications",
+    {
+        "angelia": "starbug.kubernetes.olympus.angelia:Angelia",
+        "atlas": "starbug.kubernetes.olympus.atlas:Atlas",
+        "asteria": "starbug.kubernetes.olympus.asteria:Asteria",
+        "boreas": "starbug.kubernetes.olympus.boreas:Boreas",
+        "callbacca": "starbug.kubernetes.olympus.callbacca:Callbacca",
+        "eos": "starbug.kubernetes.olympus.eos:Eos",
+        "europa": "starbug.kubernetes.olympus.europa:Europa",
+        "hades": "starbug.kubernetes.olympus.hades:Hades",
+        "harmonia": "starbug.kubernetes.olympus.harmonia:Harmonia",
+        "hermes": "starbug.kubernetes.olympus.hermes:Hermes",
+        "kiroshi": "starbug.kubernetes.devops.kiroshi:Kiroshi",
+        "metis": "starbug.kubernetes.olympus.metis:Metis",
+        "midas": "starbug.kubernetes.olympus.midas:Midas",
+        "pelops": "starbug.kubernetes.olympus.pelops:Pelops",
+        "plutus": "starbug.kubernetes.olympus.plutus:Plutus",
+        "snowstorm": "starbug.kubernetes.data.snowstorm:Snowstorm",
+        "skiron": "starbug.kubernetes.olympus.skiron:Skiron",
+        "zephyrus": "starbug.kubernetes.olympus.zephyrus:Zephyrus",
+    },
+)
+
+test_mapping = Registry(
+    "starbug.tests",
+    {
+        "test_kiroshi": "starbug.kubernetes.tests.kiroshi:TestKiroshi",
+        "test_pytest": "starbug.kubernetes.tests.pytest:Pytest",
+    },
+)
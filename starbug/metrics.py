@@ -0,0 +1,83 @@
+"""Prometheus metrics for Starbug."""
+
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
+from time import perf_counter
+
+import pendulum
+from prometheus_client import Counter, Gauge, Histogram
+
+test_stage_seconds = Histogram(
+    "starbug_test_stage_seconds",
+    "Seconds from a test being created until it reached each stage of its lifecycle.",
+    ["stage"],
+    buckets=(5, 10, 30, 60, 120, 300, 600, 900, 1200, 1800, 2700, 3600, 5400, 7200),
+)
+http_request_seconds = Histogram(
+    "starbug_http_request_duration_seconds",
+    "Seconds taken to serve API requests.",
+    ["method", "route", "status"],
+)
+kubernetes_request_seconds = Histogram(
+    "starbug_kubernetes_request_duration_seconds",
+    "Seconds taken by calls to the Kubernetes API.",
+    ["verb", "kind"],
+)
+kubernetes_request_errors = Counter(
+    "starbug_kubernetes_request_errors_total",
+    "Calls to the Kubernetes API which raised an error.",
+    ["verb", "kind"],
+)
+azure_request_seconds = Histogram(
+    "starbug_azure_request_duration_seconds",
+    "Seconds taken by calls to Azure.",
+    ["service", "operation"],
+)
+azure_request_errors = Counter(
+    "starbug_azure_request_errors_total",
+    "Calls to Azure which raised an error.",
+    ["service", "operation"],
+)
+reconcile_seconds = Histogram(
+    "starbug_reconcile_duration_seconds",
+    "Seconds taken to reconcile a test, by the phase it was in.",
+    ["phase"],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600),
+)
+tests = Gauge("starbug_tests", "Incomplete tests known to the worker, by phase.", ["phase"])
+reconcile_queue_depth = Gauge("starbug_reconcile_queue_depth", "Tests queued for reconciling.")
+reconciles_active = Gauge("starbug_reconciles_active", "Tests currently being reconciled.")
+secret_cache_hits = Gauge("starbug_secret_cache_hits", "Secret cache hits.")
+secret_cache_misses = Gauge("starbug_secret_cache_misses", "Secret cache misses.")
+azure_token_refreshes = Gauge("starbug_azure_token_refreshes", "Azure tokens acquired.")
+results_cache_hits = Gauge("starbug_results_cache_hits", "Results cache hits.")
+results_cache_misses = Gauge("starbug_results_cache_misses", "Results cache misses.")
+results_cache_evictions = Gauge("starbug_results_cache_evictions", "Results cache evictions.")
+
+
+def observe_stage(stage: str, created: str, when: pendulum.DateTime) -> None:
+    """Record how long after its creation a test reached a stage."""
+    test_stage_seconds.labels(stage=stage).observe((when - pendulum.parse(created)).total_seconds())
+
+
+@contextmanager
+def timed(histogram: Histogram, errors: Counter, **labels: str) -> Iterator[None]:
+    """Observe how long the wrapped block takes, counting it as an error if it raises."""
+    start = perf_counter()
+    try:
+        yield
+    except Exception:
+        errors.labels(**labels).inc()
+        raise
+    finally:
+        histogram.labels(**labels).observe(perf_counter() - start)
+
+
+def kubernetes_request(verb: str, kind: str) -> AbstractContextManager[None]:
+    """Time a call to the Kubernetes API."""
+    return timed(kubernetes_request_seconds, kubernetes_request_errors, verb=verb, kind=kind)
+
+
+def azure_request(service: str, operation: str) -> AbstractContextManager[None]:
+    """Time a call to Azure."""
+    return timed(azure_request_seconds, azure_request_errors, service=service, operation=operation)
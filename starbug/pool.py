@@ -0,0 +1,179 @@
+"""Keeps a pool of pre-provisioned namespaces ready to be claimed by new Starbug Tests."""
+
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import sleep
+
+import kr8s
+import pendulum
+from kr8s._exceptions import NotFoundError, ServerError
+from kr8s.objects import Namespace
+from loguru import logger
+
+from starbug.azure import AzureOIDC
+from starbug.kubernetes.apply import apply_waves, rbac_kinds, wait_all_ready
+from starbug.kubernetes.images import image_resolver
+from starbug.kubernetes.infrastructure.namespace import AITNamespace
+from starbug.kubernetes.infrastructure.roles import AITRoles
+from starbug.mapping import infrastructure_mapping
+from starbug.metrics import kubernetes_request
+from starbug.namegen import generate_name
+from starbug.settings import oidc_settings, settings
+
+pool_label = "bink.com/starbug-pool"
+
+
+class WarmPool:
+    """Keeps a pool of namespaces with infrastructure running.
+
+    Only the identities used by the pool's infrastructure are federated while a namespace is provisioned, the
+    identities of a test's applications and test suite are federated once it claims the namespace.
+
+    Pooled namespaces are labelled `bink.com/starbug-pool` with a value of `warming` while they are provisioned,
+    `ready` once every infrastructure Deployment is Available, and `claimed` once handed to a Starbug Test.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        infrastructure: list[str],
+        ready_timeout_in_seconds: int,
+        max_age_in_hours: int,
+    ) -> None:
+        """Initialize the WarmPool class.
+
+        Args:
+            size (int): The number of namespaces to keep warming or ready.
+            infrastructure (list[str]): The infrastructure deployed into each namespace, with default images.
+            ready_timeout_in_seconds (int): How long a namespace may spend warming before it is discarded.
+            max_age_in_hours (int): How long a ready namespace may wait to be claimed before it is discarded, so
+                tests never get a stale seed or outdated infrastructure images.
+
+        """
+        self.size = size
+        self.infrastructure = sorted(infrastructure)
+        self.ready_timeout_in_seconds = ready_timeout_in_seconds
+        self.max_age_in_hours = max_age_in_hours
+        self.lock = Lock()
+        required = {getattr(infrastructure_mapping[name], "identity", None) for name in self.infrastructure}
+        self.identities = [identity for identity in oidc_settings.identities if identity in required]
+
+    def run(self) -> None:
+        """Refill the pool on an interval, runs forever."""
+        while True:
+            try:
+                self.refill()
+            except Exception:  # noqa: BLE001
+                logger.exception("Refilling the namespace pool failed.")
+            sleep(settings.pool_refill_interval_in_seconds)
+
+    def matches(self, infrastructure: list[dict]) -> bool:
+        """Return whether a test's infrastructure is exactly what pooled namespaces provide."""
+        if any(item.get("image") for item in infrastructure):
+            return False
+        return sorted(item.get("name") for item in infrastructure) == self.infrastructure
+
+    def namespaces(self, state: str) -> list[Namespace]:
+        """Return the pooled namespaces in a given state."""
+        with kubernetes_request("list", "Namespace"):
+            return list(kr8s.get("namespaces", label_selector={pool_label: state}))
+
+    def refill(self) -> None:
+        """Discard namespaces stuck warming or ready for too long, then provision namespaces until the pool is full.
+
+        Namespaces are provisioned in parallel, so a refill takes at most one `ready_timeout_in_seconds`.
+        """
+        warming = []
+        for namespace in self.namespaces("warming"):
+            age = pendulum.now() - pendulum.parse(namespace.metadata.creationTimestamp)
+            if age.in_seconds() > self.ready_timeout_in_seconds:
+                logger.info(f"Pooled namespace {namespace.name} did not become ready in time, discarding.")
+                self.discard(namespace.name)
+            else:
+                warming.append(namespace)
+        ready = []
+        for namespace in self.namespaces("ready"):
+            age = pendulum.now() - pendulum.parse(namespace.metadata.creationTimestamp)
+            if age.in_hours() >= self.max_age_in_hours:
+                logger.info(f"Pooled namespace {namespace.name} has not been claimed in time, discarding.")
+                self.discard(namespace.name)
+            else:
+                ready.append(namespace)
+        missing = self.size - len(warming) - len(ready)
+        if missing <= 0:
+            return
+        with ThreadPoolExecutor(max_workers=missing, thread_name_prefix="pool") as executor:
+            futures = [executor.submit(self.provision) for _ in range(missing)]
+        for future in futures:
+            if future.exception():
+                logger.opt(exception=future.exception()).error("Provisioning a pooled namespace failed.")
+
+    def provision(self) -> None:
+        """Create a namespace with infrastructure, and mark it ready once it is Available."""
+        name = f"pool-{generate_name()}"
+        logger.info(f"Provisioning pooled namespace {name}.")
+        namespace = AITNamespace(name)
+        namespace.namespace.raw["metadata"].setdefault("labels", {})[pool_label] = "warming"
+        if any(AzureOIDC(namespace=name, identities=self.identities).setup_federated_credentials().values()):
+            logger.info(f"Failed to create Federated Identity Credentials for pooled namespace {name}, discarding.")
+            self.discard(name)
+            return
+        components = [
+            *AITRoles(name).deploy(),
+            *(
+                component
+                for infrastructure in self.infrastructure
+                for component in infrastructure_mapping[infrastructure](namespace=name).deploy()
+            ),
+        ]
+        image_resolver.pin(components)
+        waves = {
+            "namespace": list(namespace.deploy()),
+            "rbac": [component for component in components if component.kind in rbac_kinds],
+            "infrastructure": [component for component in components if component.kind not in rbac_kinds],
+        }
+        if apply_waves(waves, max_workers=settings.worker_apply_concurrency):
+            logger.info(f"Failed to deploy pooled namespace {name}, discarding.")
+            self.discard(name)
+            return
+        if wait_all_ready(
+            components,
+            max_workers=settings.worker_apply_concurrency,
+            timeout=self.ready_timeout_in_seconds,
+        ):
+            logger.info(f"Pooled namespace {name} did not become ready, discarding.")
+            self.discard(name)
+            return
+        with kubernetes_request("patch", "Namespace"):
+            namespace.namespace.patch({"metadata": {"labels": {pool_label: "ready"}}})
+        logger.info(f"Pooled namespace {name} is ready.")
+
+    def claim(self, test_name: str) -> str | None:
+        """Claim a ready namespace for a Starbug Test, returning its name or None if the pool is empty.
+
+        The claim is a patch conditional on the namespace's resourceVersion, so a namespace is never handed out twice.
+        """
+        with self.lock:
+            for namespace in self.namespaces("ready"):
+                try:
+                    with kubernetes_request("patch", "Namespace"):
+                        namespace.patch(
+                            {
+                                "metadata": {
+                                    "resourceVersion": namespace.metadata.resourceVersion,
+                                    "labels": {pool_label: "claimed", "bink.com/starbug-test": test_name},
+                                },
+                            },
+                        )
+                except (NotFoundError, ServerError):
+                    continue
+                logger.info(f"Test {test_name} claimed pooled namespace {namespace.name}.")
+                return namespace.name
+        return None
+
+    def discard(self, name: str) -> None:
+        """Delete a pooled namespace and the OIDC credentials federated while provisioning it."""
+        with contextlib.suppress(NotFoundError), kubernetes_request("delete", "Namespace"):
+            Namespace(name).delete()
+        AzureOIDC(namespace=name, identities=self.identities).remove_federated_credentials()
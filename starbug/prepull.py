@@ -0,0 +1,79 @@
+"""Keeps the images Starbug Tests use pulled onto every spot node."""
+
+from time import sleep
+
+from kr8s._exceptions import NotFoundError
+from kr8s.objects import DaemonSet
+from loguru import logger
+
+from starbug.kubernetes import pushgateway_image, starbug_image, wait_for_image
+from starbug.kubernetes.images import image_resolver
+from starbug.kubernetes.internal.prepull import Prepull
+from starbug.mapping import application_mapping, infrastructure_mapping, test_mapping
+from starbug.metrics import kubernetes_request
+from starbug.settings import settings
+
+
+def default_images() -> set[str]:
+    """Return the default image of every mapped component, and the images shared between components."""
+    mappings = (application_mapping, infrastructure_mapping, test_mapping)
+    return {cls.default_image for mapping in mappings for cls in mapping.values()} | {
+        starbug_image,
+        wait_for_image,
+        pushgateway_image,
+    }
+
+
+def build_prepull(images: set[str]) -> DaemonSet:
+    """Return the pre-pull DaemonSet for a set of images, pinned to their current digests."""
+    daemonset = Prepull(images=list(images)).daemonset
+    image_resolver.pin([daemonset])
+    return daemonset
+
+
+def sync_prepull(daemonset: DaemonSet) -> bool:
+    """Create the pre-pull DaemonSet, or update it if its images have changed.
+
+    Args:
+        daemonset (DaemonSet): The desired pre-pull DaemonSet.
+
+    Returns:
+        bool: Whether the DaemonSet was created or updated.
+
+    """
+    desired = daemonset.raw["spec"]["template"]["spec"]["initContainers"]
+    try:
+        with kubernetes_request("get", "DaemonSet"):
+            current = DaemonSet.get(name=daemonset.name, namespace=daemonset.namespace)
+    except NotFoundError:
+        logger.info(f"Creating DaemonSet/{daemonset.name} to pre-pull {len(desired) - 1} images")
+        with kubernetes_request("create", "DaemonSet"):
+            daemonset.create()
+        return True
+    existing = current.raw["spec"]["template"]["spec"].get("initContainers", [])
+    if [container["image"] for container in existing] == [container["image"] for container in desired]:
+        return False
+    logger.info(f"Updating DaemonSet/{daemonset.name} to pre-pull {len(desired) - 1} images")
+    with kubernetes_request("patch", "DaemonSet"):
+        current.patch({"spec": {"template": {"spec": {"initContainers": desired}}}})
+    return True
+
+
+class Prepuller:
+    """Keeps the pre-pull DaemonSet in step with the default images.
+
+    Images overridden by individual tests are left out, they are pulled by the test itself and would otherwise roll
+    the DaemonSet across every spot node for an image only one test uses.
+    """
+
+    def run(self) -> None:
+        """Sync the pre-pull DaemonSet periodically, runs forever.
+
+        Images are pinned to digests, so a tag which moves to a new digest rolls the DaemonSet and is pulled again.
+        """
+        while True:
+            try:
+                sync_prepull(build_prepull(default_images()))
+            except Exception:  # noqa: BLE001
+                logger.exception("Failed to sync the pre-pull DaemonSet.")
+            sleep(settings.prepull_interval_in_seconds)
@@ -0,0 +1,126 @@
+"""Local on-disk cache of test results downloaded from Azure Blob Storage."""
+
+import re
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from hashlib import sha256
+from pathlib import Path
+from time import monotonic
+from uuid import uuid4
+
+import anyio
+from loguru import logger
+
+
+class ResultsCache:
+    """A size-bounded, least recently used cache of results blobs keyed by blob name and ETag.
+
+    A cached blob is served by name without asking Blob Storage for its current ETag until the entry is older
+    than `revalidate_in_seconds`, after which the ETag is checked again and a re-uploaded result replaces the
+    cached copy.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, chunk_size: int, revalidate_in_seconds: float) -> None:
+        """Initialize the ResultsCache class.
+
+        Args:
+            path (Path): Directory to store cached blobs in, cached blobs left over from a previous run are removed.
+            max_bytes (int): Maximum combined size of all cached blobs.
+            chunk_size (int): Size of the chunks cached blobs are read back in.
+            revalidate_in_seconds (float): How long a cached blob is served before its ETag is checked again.
+
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.revalidate_in_seconds = revalidate_in_seconds
+        self.entries: OrderedDict[str, tuple[str, int, float]] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.path.mkdir(parents=True, exist_ok=True)
+        for file in self.path.iterdir():
+            if re.fullmatch(r"[0-9a-f]{64}(\.[0-9a-f]{32}\.partial)?", file.name):
+                file.unlink(missing_ok=True)
+
+    def filename(self, name: str, etag: str) -> Path:
+        """Return the path a blob is cached at."""
+        return self.path / sha256(f"{name}:{etag}".encode()).hexdigest()
+
+    def lookup(self, name: str) -> tuple[str, int] | None:
+        """Return the ETag and size of a cached blob, or None if it is not cached or is due to be revalidated."""
+        entry = self.entries.get(name)
+        if entry is None or monotonic() - entry[2] > self.revalidate_in_seconds:
+            return None
+        return entry[0], entry[1]
+
+    def validate(self, name: str, etag: str) -> None:
+        """Record the blob's current ETag, keeping the cached copy if it still matches and removing it otherwise."""
+        entry = self.entries.get(name)
+        if entry is None:
+            return
+        if entry[0] == etag:
+            self.entries[name] = (etag, entry[1], monotonic())
+        else:
+            self.remove(name)
+
+    async def open(self, name: str, etag: str) -> anyio.AsyncFile | None:
+        """Open a cached blob for reading, or return None if it is not cached at this ETag.
+
+        The open file stays readable if the blob is evicted or replaced while it is being read.
+        """
+        entry = self.entries.get(name)
+        if entry is None or entry[0] != etag:
+            self.misses += 1
+            return None
+        try:
+            file = await anyio.open_file(self.filename(name, etag), "rb")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(name)
+        return file
+
+    async def read(self, file: anyio.AsyncFile, start: int, end: int) -> AsyncIterator[bytes]:
+        """Yield the inclusive byte range of an opened cached blob in chunks, closing it once done."""
+        async with file:
+            await file.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+
+    async def store(self, name: str, etag: str, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Yield chunks of a blob as they are downloaded, caching the blob once it has been fully received."""
+        path = self.filename(name, etag)
+        partial = path.with_name(f"{path.name}.{uuid4().hex}.partial")
+        size = 0
+        try:
+            async with await anyio.open_file(partial, "wb") as file:
+                async for chunk in chunks:
+                    await file.write(chunk)
+                    size += len(chunk)
+                    yield chunk
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        if name in self.entries:
+            self.remove(name)
+        partial.rename(path)
+        self.entries[name] = (etag, size, monotonic())
+        self.size += size
+        while self.size > self.max_bytes and self.entries:
+            self.remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def remove(self, name: str) -> None:
+        """Remove a blob from the cache."""
+        etag, size, _ = self.entries.pop(name)
+        self.size -= size
+        self.filename(name, etag).unlink(missing_ok=True)
+        logger.info(f"Removed {name} from the results cache")
@@ -0,0 +1,86 @@
+"""Archives and removes completed Starbug Tests."""
+
+import json
+from contextlib import suppress
+from time import sleep
+
+import kr8s
+import pendulum
+from azure.core.exceptions import ResourceExistsError
+from azure.storage.blob import BlobServiceClient, ContainerClient
+from kr8s._exceptions import NotFoundError
+from loguru import logger
+
+from starbug.kubernetes.custom.resources import StarbugTest
+from starbug.metrics import azure_request, kubernetes_request
+from starbug.settings import settings
+
+
+class Retention:
+    """Deletes completed Starbug Tests once they are too old or too many, archiving a record of each first."""
+
+    def __init__(self, archive_container: str, max_age_in_hours: int, max_count: int) -> None:
+        """Initialize the Retention class.
+
+        Args:
+            archive_container (str): Blob Storage container that records of deleted tests are uploaded to.
+            max_age_in_hours (int): Tests completed longer ago than this are deleted.
+            max_count (int): Only this many of the most recently completed tests are kept.
+
+        """
+        self.archive_container = archive_container
+        self.max_age_in_hours = max_age_in_hours
+        self.max_count = max_count
+        self.container: ContainerClient | None = None
+
+    def get_container(self) -> ContainerClient:
+        """Return a client for the archive container, creating the container the first time."""
+        if self.container is None:
+            client = BlobServiceClient.from_connection_string(settings.storage_account_dsn)
+            container = client.get_container_client(self.archive_container)
+            with suppress(ResourceExistsError), azure_request("blob", "create_container"):
+                container.create_container()
+            self.container = container
+        return self.container
+
+    def completed_at(self, test: StarbugTest) -> pendulum.DateTime:
+        """Return when a test completed, falling back to its creation for tests without recorded timings."""
+        completed = test.status.get("timings", {}).get("credentialsRemoved")
+        return pendulum.parse(completed or test.metadata.creationTimestamp)
+
+    def run(self) -> None:
+        """Collect completed tests periodically, runs forever."""
+        while True:
+            try:
+                self.collect()
+            except Exception:  # noqa: BLE001
+                logger.exception("Failed to collect completed Starbug Tests.")
+            sleep(settings.retention_interval_in_seconds)
+
+    def collect(self) -> None:
+        """Archive and delete every completed test outside the retention limits.
+
+        A test is only deleted once its record has been uploaded, a failed upload stops the collection.
+        """
+        with kubernetes_request("list", "StarbugTest"):
+            tests = kr8s.get("tests", namespace="starbug")
+        tests = sorted((test for test in tests if test.status.complete), key=self.completed_at, reverse=True)
+        cutoff = pendulum.now().subtract(hours=self.max_age_in_hours)
+        for index, test in enumerate(tests):
+            if index >= self.max_count or self.completed_at(test) < cutoff:
+                self.archive(test)
+                logger.info(f"Deleting completed test {test.name}")
+                with suppress(NotFoundError), kubernetes_request("delete", "StarbugTest"):
+                    test.delete()
+
+    def archive(self, test: StarbugTest) -> None:
+        """Upload a compact record of a test to the archive container."""
+        record = {
+            "name": test.name,
+            "created": test.metadata.creationTimestamp,
+            "deleted": pendulum.now().to_iso8601_string(),
+            "spec": test.raw.get("spec", {}),
+            "status": test.raw.get("status", {}),
+        }
+        with azure_request("blob", "upload_blob"):
+            self.get_container().upload_blob(name=f"{test.name}.json", data=json.dumps(record), overwrite=True)
@@ -1,5 +1,6 @@
 """Settings for the Starbug application."""
 
+from pathlib import Path
 from typing import ClassVar
 from uuid import UUID
 
@@ -13,7 +14,34 @@ class Settings(BaseSettings):
     storage_account_dsn: str
     storage_account_container: str = "results"
     results_base_url: HttpUrl = "https://starbug.ait.uksouth.bink.sh/results"
+    results_chunk_size: int = 4 * 1024 * 1024
+    results_cache_path: Path = Path("/tmp/starbug-results")
+    results_cache_max_bytes: int = 1024 * 1024 * 1024
+    results_cache_revalidate_in_seconds: int = 300
     maximum_test_duration_in_minutes: int = 120
+    events_keepalive_in_seconds: float = 15
+    worker_resync_interval_in_seconds: int = 300
+    worker_watch_retry_in_seconds: int = 5
+    api_batch_max_size: int = 100
+    api_create_concurrency: int = 16
+    worker_concurrency: int = 4
+    worker_apply_concurrency: int = 16
+    worker_metrics_port: int = 9100
+    worker_ready_timeout_in_seconds: int = 900
+    image_digest_ttl_in_seconds: int = 600
+    prepull_interval_in_seconds: int = 300
+    postgres_seed_concurrency: int = 4
+    pool_size: int = 0
+    pool_infrastructure: list[str] = ["postgres", "rabbitmq", "redis"]
+    pool_refill_interval_in_seconds: int = 30
+    pool_ready_timeout_in_seconds: int = 600
+    pool_max_age_in_hours: int = 24
+    snapshot_container: str = "snapshots"
+    snapshot_concurrency: int = 4
+    retention_interval_in_seconds: int = 3600
+    retention_max_age_in_hours: int = 168
+    retention_max_count: int = 500
+    retention_archive_container: str = "archive"
 
 
 settings = Settings()
@@ -26,6 +54,9 @@ class OIDCSettings(BaseSettings):
     resource_group_name: str = "uksouth-ait"
     subscription_id: UUID = "0b92124d-e5fe-4c9a-a898-1fdf02502e01"
     ignored_prefixes: ClassVar[list[str]] = ["uksouth"]
+    max_workers: int = 14
+    retries: int = 5
+    retry_backoff_in_seconds: float = 1
     identities: ClassVar[list[str]] = [
         "angelia",
         "boreas",
@@ -0,0 +1,85 @@
+"""Stores and fetches Postgres snapshots in Blob Storage."""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from pathlib import Path
+
+import pendulum
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from azure.storage.blob import BlobServiceClient, ContainerClient
+from loguru import logger
+
+from starbug.settings import settings
+
+
+def get_container() -> ContainerClient:
+    """Return a client for the snapshot container."""
+    client = BlobServiceClient.from_connection_string(settings.storage_account_dsn)
+    return client.get_container_client(settings.snapshot_container)
+
+
+def upload_snapshot(path: Path) -> str:
+    """Upload every dump in a directory as a new snapshot, then mark it as the latest.
+
+    Dumps are uploaded under a timestamped prefix and `latest` is only updated once every dump has been uploaded,
+    so a restore never sees a partially uploaded snapshot.
+
+    Args:
+        path (Path): The directory containing one `<database>.dump` file per database.
+
+    Returns:
+        str: The name of the uploaded snapshot.
+
+    """
+    container = get_container()
+    with suppress(ResourceExistsError):
+        container.create_container()
+    snapshot = pendulum.now("UTC").format("YYYYMMDDTHHmmss")
+    dumps = sorted(path.glob("*.dump"))
+
+    def upload(dump: Path) -> None:
+        logger.info(f"Uploading {dump.name} to snapshot {snapshot}")
+        with dump.open("rb") as data:
+            container.upload_blob(name=f"postgres/{snapshot}/{dump.name}", data=data, max_concurrency=4)
+
+    with ThreadPoolExecutor(max_workers=settings.snapshot_concurrency) as pool:
+        list(pool.map(upload, dumps))
+    container.upload_blob(name="postgres/latest", data=snapshot, overwrite=True)
+    logger.info(f"Snapshot {snapshot} uploaded with {len(dumps)} databases")
+    return snapshot
+
+
+def download_snapshot(path: Path, databases: list[str] | None = None) -> list[str]:
+    """Download the latest snapshot into a directory.
+
+    Args:
+        path (Path): The directory to download `<database>.dump` files into.
+        databases (list[str] | None, optional): Only download these databases. Defaults to every database.
+
+    Returns:
+        list[str]: The databases downloaded, empty if no snapshot has been uploaded yet.
+
+    """
+    container = get_container()
+    try:
+        snapshot = container.download_blob("postgres/latest").readall().decode()
+    except ResourceNotFoundError:
+        logger.info("No Postgres snapshot found, databases will be seeded from the shared server")
+        return []
+    blobs = [
+        blob.name
+        for blob in container.list_blobs(name_starts_with=f"postgres/{snapshot}/")
+        if databases is None or Path(blob.name).stem in databases
+    ]
+    path.mkdir(parents=True, exist_ok=True)
+
+    def download(name: str) -> str:
+        logger.info(f"Downloading {name}")
+        with (path / Path(name).name).open("wb") as data:
+            container.download_blob(name, max_concurrency=4).readinto(data)
+        return Path(name).stem
+
+    with ThreadPoolExecutor(max_workers=settings.snapshot_concurrency) as pool:
+        downloaded = list(pool.map(download, blobs))
+    logger.info(f"Downloaded snapshot {snapshot} with {len(downloaded)} databases")
+    return downloaded
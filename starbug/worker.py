@@ -1,20 +1,42 @@
 """Runs tests depending on state changes to the Starbug CRD."""
 
 import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from threading import Lock, Thread
 from time import sleep
 
 import kr8s
 import pendulum
 from kr8s._exceptions import NotFoundError
-from kr8s.objects import Namespace
+from kr8s.objects import APIObject, Namespace
 from loguru import logger
+from prometheus_client import start_http_server
 
-from starbug.azure import AzureOIDC
+from starbug.azure import AzureOIDC, get_credential
+from starbug.kubernetes import secret_cache
+from starbug.kubernetes.apply import apply, dependency_tiers, is_ready, rbac_kinds
 from starbug.kubernetes.custom.resources import StarbugTest
+from starbug.kubernetes.images import image_resolver
 from starbug.kubernetes.infrastructure.namespace import AITNamespace
+from starbug.kubernetes.infrastructure.postgres import Postgres
 from starbug.kubernetes.infrastructure.roles import AITRoles
 from starbug.mapping import application_mapping, infrastructure_mapping, test_mapping
-from starbug.settings import settings
+from starbug.metrics import (
+    azure_token_refreshes,
+    kubernetes_request,
+    observe_stage,
+    reconcile_queue_depth,
+    reconcile_seconds,
+    reconciles_active,
+    secret_cache_hits,
+    secret_cache_misses,
+    tests,
+)
+from starbug.pool import WarmPool
+from starbug.prepull import Prepuller
+from starbug.retention import Retention
+from starbug.settings import oidc_settings, settings
 
 
 class Worker:
@@ -22,68 +44,428 @@ class Worker:
 
     def __init__(self) -> None:
         """Initialize the Starbug Worker class."""
+        self.queue: Queue[str] = Queue()
+        self.resource_version: str | None = None
+        self.executor = ThreadPoolExecutor(max_workers=settings.worker_concurrency, thread_name_prefix="reconcile")
+        self.lock = Lock()
+        self.active: set[str] = set()
+        self.dirty: set[str] = set()
+        self.phases: dict[str, str] = {}
+        self.waiting: dict[str, str] = {}
+        self.warm_pool = WarmPool(
+            size=settings.pool_size,
+            infrastructure=settings.pool_infrastructure,
+            ready_timeout_in_seconds=settings.pool_ready_timeout_in_seconds,
+            max_age_in_hours=settings.pool_max_age_in_hours,
+        )
 
     def get_tests(self) -> None:
-        """Get Starbug Tests."""
+        """Get Starbug Tests.
+
+        Tests are queued as watch events arrive, with a periodic resync of every test as a safety net.
+        Queued tests are reconciled concurrently, up to `settings.worker_concurrency` at a time.
+        """
+        self.serve_metrics()
+        Thread(target=self.watch_tests, name="watch", daemon=True).start()
+        for kind in ("deployments", "jobs"):
+            Thread(target=self.watch_workloads, args=(kind,), name=f"watch-{kind}", daemon=True).start()
+        Thread(target=self.resync_tests, name="resync", daemon=True).start()
+        Thread(target=secret_cache.watch, name="secrets", daemon=True).start()
+        retention = Retention(
+            archive_container=settings.retention_archive_container,
+            max_age_in_hours=settings.retention_max_age_in_hours,
+            max_count=settings.retention_max_count,
+        )
+        Thread(target=retention.run, name="retention", daemon=True).start()
+        Thread(target=Prepuller().run, name="prepull", daemon=True).start()
+        if settings.pool_size:
+            Thread(target=self.warm_pool.run, name="pool", daemon=True).start()
         while True:
-            for test in kr8s.get("tests", namespace="starbug"):
-                if not test.status.complete:
-                    if test.status.phase == "Pending":
-                        self.deploy_test(test)
-                    if test.status.phase in ("Completed", "Failed", "Cancelled"):
-                        self.destroy_test(test)
-                    if test.status.phase == "Running":
-                        self.check_running_test(test)
-            sleep(60)
+            self.dispatch(self.queue.get())
+            self.queue.task_done()
+
+    def serve_metrics(self) -> None:
+        """Expose Prometheus metrics on `settings.worker_metrics_port`."""
+        reconcile_queue_depth.set_function(self.queue.qsize)
+        reconciles_active.set_function(lambda: len(self.active))
+        secret_cache_hits.set_function(lambda: secret_cache.hits)
+        secret_cache_misses.set_function(lambda: secret_cache.misses)
+        azure_token_refreshes.set_function(lambda: get_credential().token_refreshes)
+        start_http_server(settings.worker_metrics_port)
+
+    def dispatch(self, name: str) -> None:
+        """Submit a Starbug Test to the reconcile pool unless it is already being reconciled.
+
+        A test queued while its reconcile is in progress is marked dirty and reconciled again once the
+        current reconcile finishes, so two reconciles of the same test never overlap.
+        """
+        with self.lock:
+            if name in self.active:
+                self.dirty.add(name)
+                return
+            self.active.add(name)
+        self.executor.submit(self.run_reconcile, name)
+
+    def run_reconcile(self, name: str) -> None:
+        """Reconcile a Starbug Test until no further changes have been queued for it."""
+        while True:
+            try:
+                self.reconcile(name)
+            except Exception:  # noqa: BLE001
+                logger.exception(f"Failed to reconcile test {name}.")
+            with self.lock:
+                if name not in self.dirty:
+                    self.active.discard(name)
+                    return
+                self.dirty.discard(name)
+
+    def watch_tests(self) -> None:
+        """Queue Starbug Tests as ADDED and MODIFIED events are received from Kubernetes.
+
+        The last seen resourceVersion is used as a bookmark so a dropped watch resumes where it left off,
+        starting a watch without a resourceVersion replays every existing test as an ADDED event.
+        """
+        while True:
+            try:
+                for event, test in kr8s.watch("tests", namespace="starbug", since=self.resource_version):
+                    if event == "ERROR":
+                        logger.info("Watch resourceVersion expired, restarting watch from current state.")
+                        self.resource_version = None
+                        break
+                    self.resource_version = test.metadata.resourceVersion
+                    if event in ("ADDED", "MODIFIED") and not test.status.complete:
+                        self.phases[test.name] = test.status.phase
+                        self.queue.put(test.name)
+                    else:
+                        self.phases.pop(test.name, None)
+                    for phase in ("Pending", "Running", "Completed", "Failed", "Cancelled"):
+                        tests.labels(phase=phase).set(list(self.phases.values()).count(phase))
+            except Exception:  # noqa: BLE001
+                logger.exception("Watch on Starbug Tests failed, retrying.")
+                sleep(settings.worker_watch_retry_in_seconds)
+
+    def watch_workloads(self, kind: str) -> None:
+        """Queue the Starbug Test waiting on a namespace whenever one of its Deployments or Jobs changes.
+
+        A single watch per kind covers every namespace, so a test waiting for a wave to become ready is woken up
+        by the watch instead of holding a reconcile thread.
+        """
+        resource_version = None
+        while True:
+            try:
+                for event, component in kr8s.watch(kind, namespace=kr8s.ALL, since=resource_version):
+                    if event == "ERROR":
+                        logger.info(f"Watch on {kind} expired, restarting watch from current state.")
+                        resource_version = None
+                        break
+                    resource_version = component.metadata.resourceVersion
+                    name = self.waiting.get(component.namespace)
+                    if name:
+                        self.queue.put(name)
+            except Exception:  # noqa: BLE001
+                logger.exception(f"Watch on {kind} failed, retrying.")
+                sleep(settings.worker_watch_retry_in_seconds)
+
+    def resync_tests(self) -> None:
+        """Periodically queue every incomplete Starbug Test in case a watch event was missed."""
+        while True:
+            sleep(settings.worker_resync_interval_in_seconds)
+            logger.info(f"Secret cache hits: {secret_cache.hits}, misses: {secret_cache.misses}")
+            logger.info(f"Azure token refreshes: {get_credential().token_refreshes}")
+            try:
+                with kubernetes_request("list", "StarbugTest"):
+                    resynced = kr8s.get("tests", namespace="starbug")
+                for test in resynced:
+                    if not test.status.complete:
+                        self.queue.put(test.name)
+            except Exception:  # noqa: BLE001
+                logger.exception("Resync of Starbug Tests failed.")
+
+    def reconcile(self, name: str) -> None:
+        """Move a Starbug Test towards the state requested by its phase."""
+        test = StarbugTest({"metadata": {"name": name, "namespace": "starbug"}})
+        try:
+            with kubernetes_request("get", "StarbugTest"):
+                test.refresh()
+        except NotFoundError:
+            return
+        if test.status.complete:
+            return
+        with reconcile_seconds.labels(phase=test.status.phase).time():
+            if test.status.phase == "Pending":
+                self.deploy_test(test)
+            if test.status.phase in ("Completed", "Failed", "Cancelled"):
+                self.destroy_test(test)
+            if test.status.phase == "Running":
+                self.check_running_test(test)
+
+    def patch_status(self, test: StarbugTest, status: dict) -> None:
+        """Patch the status of a Starbug Test."""
+        with kubernetes_request("patch", "StarbugTest"):
+            test.patch({"status": status})
+
+    def namespace_of(self, test: StarbugTest) -> str:
+        """Return the namespace a Starbug Test is deployed to, either its own or one claimed from the pool."""
+        return test.status.get("namespace") or test.metadata.name
+
+    def required_identities(self, test: StarbugTest) -> list[str]:
+        """Return the Managed Identities used by the applications and test suite of a Starbug Test."""
+        components = [application_mapping.get(application.get("name")) for application in test.spec.applications]
+        components.append(test_mapping.get(test.spec.test.get("name")))
+        required = {getattr(component, "identity", None) for component in components}
+        return [identity for identity in oidc_settings.identities if identity in required]
+
+    def required_databases(self, test: StarbugTest) -> list[str]:
+        """Return the Postgres databases used by the applications and test suite of a Starbug Test."""
+        components = [application_mapping.get(application.get("name")) for application in test.spec.applications]
+        components.append(test_mapping.get(test.spec.test.get("name")))
+        return sorted({database for component in components for database in getattr(component, "databases", [])})
+
+    def build_components(
+        self,
+        test: StarbugTest,
+        namespace_name: str,
+        *,
+        pooled: bool,
+    ) -> tuple[dict[str, type], dict[str, tuple]]:
+        """Return the classes and deployable objects, by name, of every component of a Starbug Test.
+
+        Infrastructure is left out for pooled namespaces, where it is already running.
+        """
+        classes, modules = {}, {}
+        for infrastructure in [] if pooled else test.spec.infrastructure:
+            name, image = infrastructure.get("name"), infrastructure.get("image")
+            options = {}
+            if infrastructure_mapping[name] is Postgres:
+                options = {
+                    "databases": self.required_databases(test),
+                    "parallelism": settings.postgres_seed_concurrency,
+                }
+            classes[name] = infrastructure_mapping[name]
+            modules[name] = classes[name](namespace=namespace_name, image=image, **options).deploy()
+        for application in test.spec.applications:
+            name, image = application.get("name"), application.get("image")
+            classes[name] = application_mapping[name]
+            modules[name] = classes[name](namespace=namespace_name, image=image).deploy()
+        name, image = test.spec.test.get("name"), test.spec.test.get("image")
+        classes[name] = test_mapping[name]
+        modules[name] = classes[name](namespace=namespace_name, image=image).deploy()
+        return classes, modules
+
+    def build_waves(
+        self,
+        test: StarbugTest,
+        namespace_name: str,
+        *,
+        pooled: bool,
+    ) -> tuple[dict[str, list[APIObject]], dict[str, list[APIObject]]]:
+        """Return the objects of a Starbug Test grouped into named waves, and the gating objects of each wave.
+
+        Gating objects are the components later waves depend on. Waves which would be empty are left out.
+        """
+        classes, modules = self.build_components(test, namespace_name, pooled=pooled)
+        tiers = dependency_tiers({name: getattr(cls, "depends_on", []) for name, cls in classes.items()})
+        depended_on = {dependency for cls in classes.values() for dependency in getattr(cls, "depends_on", [])}
+        rbac = [component for module in modules.values() for component in module if component.kind in rbac_kinds]
+        if not pooled:
+            rbac.extend(AITRoles(namespace_name).deploy())
+        waves = {"namespace": [] if pooled else list(AITNamespace(namespace_name).deploy()), "rbac": rbac}
+        gates = {}
+        for index, tier in enumerate(tiers):
+            components = [component for name in tier for component in modules[name]]
+            waves[f"tier{index}"] = [component for component in components if component.kind not in rbac_kinds]
+            gates[f"tier{index}"] = [component for name in tier if name in depended_on for component in modules[name]]
+        return {wave: components for wave, components in waves.items() if components}, gates
+
+    def apply_waves(
+        self,
+        test: StarbugTest,
+        waves: dict[str, list[APIObject]],
+        gates: dict[str, list[APIObject]],
+    ) -> bool:
+        """Create the waves of a Starbug Test after the last one recorded in `status.wave`.
+
+        Args:
+            test (StarbugTest): The test being deployed.
+            waves (dict[str, list[APIObject]]): The objects to create, grouped into named waves in creation order.
+            gates (dict[str, list[APIObject]]): Objects, by wave name, which must become ready before the next
+                wave is created.
+
+        Returns:
+            bool: Whether every wave has been created, False if a wave is still waiting to become ready.
+
+        Raises:
+            RuntimeError: If an object failed to create, a Job failed, or a wave did not become ready in time.
+
+        """
+        names = list(waves)
+        created = test.status.get("wave")
+        if created in gates and self.pending_gates(test, created, gates[created]):
+            return False
+        remaining = names[names.index(created) + 1 :] if created in names else names
+        image_resolver.pin(component for wave in remaining for component in waves[wave])
+        for wave in remaining:
+            failures = apply(waves[wave], max_workers=settings.worker_apply_concurrency)
+            for component, error in failures:
+                logger.error(f"Failed to deploy {component.kind}/{component.name} in the {wave} wave: {error}")
+            if failures:
+                msg = f"Failed to create the {wave} wave"
+                raise RuntimeError(msg)
+            self.record_timing(test, f"{wave}Applied")
+            self.patch_status(test, {"wave": wave})
+            if self.pending_gates(test, wave, gates.get(wave, [])):
+                return False
+        return True
+
+    def pending_gates(self, test: StarbugTest, wave: str, gates: list[APIObject]) -> list[APIObject]:
+        """Return the components a later wave depends on which are not ready yet, without waiting for them.
+
+        Args:
+            test (StarbugTest): The test being deployed.
+            wave (str): The name of the wave the components were created in.
+            gates (list[APIObject]): The components of the wave which later waves depend on.
+
+        Raises:
+            RuntimeError: If a Job has Failed, or the wave has not become ready within
+                `settings.worker_ready_timeout_in_seconds` of being created.
+
+        """
+        pending = [component for component in gates if not is_ready(component)]
+        applied = pendulum.parse(test.status.timings[f"{wave}Applied"])
+        if pending and (pendulum.now() - applied).in_seconds() > settings.worker_ready_timeout_in_seconds:
+            msg = f"{', '.join(f'{c.kind}/{c.name}' for c in pending)} in the {wave} wave did not become ready"
+            raise RuntimeError(msg)
+        return pending
 
     def deploy_test(self, test: StarbugTest) -> None:
-        """Deploy Starbug Tests."""
-        modules = []
-        namespace_name = test.metadata.name
-        AzureOIDC(namespace=namespace_name).setup_federated_credentials()
-        modules.append(AITNamespace(namespace_name).deploy())
-        modules.append(AITRoles(namespace_name).deploy())
+        """Deploy Starbug Tests.
+
+        Objects are created in waves: the namespace, then RBAC and service accounts, then one wave per tier of
+        the dependency graph declared by each component's `depends_on`. Each wave is created concurrently, and
+        the components a later tier depends on must become ready before that tier is created.
+
+        The last created wave is stored in `status.wave`, so every reconcile carries on from where the previous
+        one stopped and objects which already exist are left as they are. A reconcile never waits for a wave to
+        become ready, the test is queued again by `watch_workloads` as the wave's Deployments and Jobs change.
+
+        Tests whose infrastructure matches the warm pool claim a pooled namespace instead, which already has its
+        infrastructure running, so only credentials for the test's own identities are federated and only its
+        applications and test suite are deployed.
+        """
+        timings = test.status.get("timings", {})
+        self.record_timing(test, "pickedUp")
+        pooled = test.status.get("namespace")
+        if "pickedUp" not in timings and self.warm_pool.size and self.warm_pool.matches(test.spec.infrastructure):
+            pooled = self.warm_pool.claim(test.name)
+            if pooled:
+                self.patch_status(test, {"namespace": pooled})
+                self.record_timing(test, "namespaceClaimed")
+        namespace_name = self.namespace_of(test)
+        if "oidcReady" not in timings:
+            oidc = AzureOIDC(namespace=namespace_name, identities=self.required_identities(test))
+            if any(oidc.setup_federated_credentials().values()):
+                logger.info("Failed to create Federated Identity Credentials, destroying.")
+                self.patch_status(test, {"phase": "Failed"})
+                return
+            self.record_timing(test, "oidcReady")
         try:
-            for infrastructure in test.spec.infrastructure:
-                name, image = infrastructure.get("name"), infrastructure.get("image")
-                modules.append(infrastructure_mapping[name](namespace=namespace_name, image=image).deploy())
-            for application in test.spec.applications:
-                name, image = application.get("name"), application.get("image")
-                modules.append(application_mapping[name](namespace=namespace_name, image=image).deploy())
-            test_suite_name = test.spec.test.get("name")
-            test_suite_image = test.spec.test.get("image")
-            modules.append(
-                test_mapping[test_suite_name](namespace=namespace_name, image=test_suite_image).deploy(),
-            )
-        except KeyError:
-            logger.info("Failed to deploy test, destroying.")
-            test.patch({"status": {"phase": "Failed"}})
+            waves, gates = self.build_waves(test, namespace_name, pooled=bool(pooled))
+        except (KeyError, ValueError):
+            logger.exception("Failed to deploy test, destroying.")
+            self.patch_status(test, {"phase": "Failed"})
+            return
+        try:
+            deployed = self.apply_waves(test, waves, gates)
+        except RuntimeError:
+            logger.exception("Failed to deploy test, destroying.")
+            self.waiting.pop(namespace_name, None)
+            self.patch_status(test, {"phase": "Failed"})
             return
-        for module in modules:
-            for component in module:
-                logger.info(f"Deploying {component.kind}/{component.name}")
-                component.create()
-        test.patch({"status": {"phase": "Running"}})
+        if not deployed:
+            self.waiting[namespace_name] = test.name
+            return
+        self.waiting.pop(namespace_name, None)
+        self.patch_status(test, {"phase": "Running"})
 
     def destroy_test(self, test: StarbugTest) -> None:
-        """Destroy Starbug Tests."""
-        namespace_name = test.metadata.name
-        with contextlib.suppress(NotFoundError):
+        """Destroy Starbug Tests.
+
+        Workload timings are best effort and never hold up deleting the namespace, which Kubernetes finishes
+        asynchronously, so only the request to delete it is timed.
+        """
+        namespace_name = self.namespace_of(test)
+        self.waiting.pop(namespace_name, None)
+        identities = self.required_identities(test)
+        if test.status.get("namespace"):
+            identities = sorted({*identities, *self.warm_pool.identities})
+        try:
+            self.record_workload_timings(test)
+        except Exception:  # noqa: BLE001
+            logger.exception(f"Failed to record workload timings for test {test.name}.")
+        with contextlib.suppress(NotFoundError), kubernetes_request("delete", "Namespace"):
             Namespace(namespace_name).delete()
-        AzureOIDC(namespace_name).remove_federated_credentials()
-        test.patch({"status": {"complete": True}})
+        self.record_timing(test, "namespaceDeleteRequested")
+        AzureOIDC(namespace_name, identities=identities).remove_federated_credentials()
+        self.record_timing(test, "credentialsRemoved")
+        self.patch_status(test, {"complete": True})
+
+    def record_timing(self, test: StarbugTest, stage: str, when: pendulum.DateTime | None = None) -> None:
+        """Record when a test reached a stage in `status.timings` and the stage duration histogram.
+
+        Each stage is only recorded the first time it is reached.
+        """
+        if stage in test.status.get("timings", {}):
+            return
+        when = when or pendulum.now("UTC")
+        self.patch_status(test, {"timings": {stage: when.to_iso8601_string()}})
+        observe_stage(stage, created=test.metadata.creationTimestamp, when=when)
+
+    def record_workload_timings(self, test: StarbugTest) -> None:
+        """Record when the first pod became Ready and when the test suite Job started and finished."""
+        namespace_name = self.namespace_of(test)
+        with kubernetes_request("list", "Pod"):
+            pods = kr8s.get("pods", namespace=namespace_name)
+        with kubernetes_request("list", "Job"):
+            jobs = kr8s.get("jobs", namespace=namespace_name, label_selector={"bink.com/starbug": "test"})
+        ready = [
+            pendulum.parse(condition.lastTransitionTime)
+            for pod in pods
+            for condition in pod.status.get("conditions", [])
+            if condition.type == "Ready" and condition.status == "True"
+        ]
+        if ready:
+            self.record_timing(test, "firstPodReady", min(ready))
+        for job in jobs:
+            if job.status.get("startTime"):
+                self.record_timing(test, "jobStarted", pendulum.parse(job.status.startTime))
+            finished = [
+                condition.lastTransitionTime
+                for condition in job.status.get("conditions", [])
+                if condition.type in ("Complete", "Failed") and condition.status == "True"
+            ]
+            if finished:
+                self.record_timing(test, "jobFinished", pendulum.parse(finished[0]))
 
     def check_running_test(self, test: StarbugTest) -> None:
-        """Ensure no test is allowed to run for more than two hours."""
-        namespace_name = test.metadata.name
+        """Ensure no test is allowed to run for more than two hours.
+
+        The duration is measured from when the test was picked up, as a pooled namespace may predate its test.
+        """
+        namespace_name = self.namespace_of(test)
+        try:
+            self.record_workload_timings(test)
+        except Exception:  # noqa: BLE001
+            logger.exception(f"Failed to record workload timings for test {test.name}.")
         namespace = Namespace(namespace_name)
-        namespace.refresh()
+        with kubernetes_request("get", "Namespace"):
+            namespace.refresh()
         time_now = pendulum.now()
-        time_created = pendulum.parse(namespace.metadata.creationTimestamp)
+        picked_up = test.status.get("timings", {}).get("pickedUp")
+        time_created = pendulum.parse(picked_up or namespace.metadata.creationTimestamp)
         time_delta = time_now - time_created
         if time_delta.in_minutes() > settings.maximum_test_duration_in_minutes:
             logger.info(
-                f"Test {namespace_name} has been running for more than {settings.maximum_test_duration_in_minutes} "
+                f"Test {test.name} has been running for more than {settings.maximum_test_duration_in_minutes} "
                 "minutes, marking as failed.",
             )
-            test.patch({"status": {"phase": "Failed"}})
+            self.patch_status(test, {"phase": "Failed"})